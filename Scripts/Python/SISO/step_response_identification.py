@@ -1,111 +1,216 @@
-import pandas as pd
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Union
 import numpy as np
-from typing import Tuple
-import control
-from control.matlab import step
-import matplotlib.pyplot as plt
-import easygui
+import pandas as pd
+
+HEATERS = (1, 2)
+CHUNK_SIZE = 100000  # Log rows read at a time
+LOG_EXTENSIONS = ('.csv', '.parquet', '.arrow')
+RESULT_COLUMNS = ['FILE', 'HEATER', 'STATIC_GAIN', 'TIME_DELAY', 'TIME_CONSTANT', 'STEP_POWER', 'INITIAL_TEMPERATURE', 'ERROR']
+
 
-def check_data(dataframe):
+class StepResponse(NamedTuple):
     """
-    Check if the DataFrame represents a step response.
+    Step response of one heater, starting at the step.
 
-    Args:
-        dataframe (pd.DataFrame): The DataFrame to check.
+    Attributes:
+        time (np.ndarray): Time since the step [s].
+        temperature (np.ndarray): Heater temperature [ºC].
+        step_power (float): Magnitude of the additive noise step [%].
+    """
+    time: np.ndarray
+    temperature: np.ndarray
+    step_power: float
 
+
+class FOPDTModel(NamedTuple):
+    """
+    First order plus dead time model G(s) = K e^(-Ls) / (τs + 1) of one heater.
     """
+    static_gain: float
+    time_delay: float
+    time_constant: float
+    step_power: float
+    initial_temperature: float
 
-    assert 'H1_ADD_NOISE' in dataframe.columns, "Invalid experiment CSV file"
 
-    dataframe_test = dataframe.copy()
-    dataframe_test.drop_duplicates(subset='H1_ADD_NOISE', keep='first', inplace=True)
-    nonzero_points = dataframe_test[dataframe_test['H1_ADD_NOISE'] != 0]
-    assert len(nonzero_points) == 1, "The experiment is not a step response"
+def read_chunks(file_path: str, columns: Sequence[str], chunk_size: int = CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Read only the given columns of a log file, chunk by chunk.
 
+    Args:
+        file_path (str): The path to the CSV, Parquet or Feather (.arrow) log file.
+        columns (Sequence[str]): The columns to read.
+        chunk_size (int): The maximum number of rows per chunk.
 
-def load_data(file_path: str) -> pd.DataFrame:
+    Yields:
+        pd.DataFrame: The next chunk of the log.
     """
-    Load data from a CSV file.
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size, columns=list(columns)):
+            yield batch.to_pandas()
+    elif extension == '.arrow':
+        import pyarrow as pa
+        with pa.memory_map(file_path) as source:
+            reader = pa.ipc.open_file(source)
+            for index in range(reader.num_record_batches):
+                yield reader.get_batch(index).select(list(columns)).to_pandas()
+    else:
+        yield from pd.read_csv(file_path, usecols=list(columns), chunksize=chunk_size)
+
+
+def read_step_responses(file_path: str, heaters: Sequence[int] = HEATERS, chunk_size: int = CHUNK_SIZE) -> Dict[int, Union[StepResponse, ValueError]]:
+    """
+    Stream once through a log and extract the step response of each heater.
+
+    Only the time, temperature and additive noise columns are read, and only the samples
+    after the step are kept in memory. A heater without a valid step does not affect the others.
 
     Args:
-        file_path (str): The path to the CSV file.
+        file_path (str): The path to the log file.
+        heaters (Sequence[int]): The heaters to extract.
+        chunk_size (int): The maximum number of rows read at a time.
 
     Returns:
-        pd.DataFrame: The loaded data as a pandas DataFrame.
+        Dict[int, Union[StepResponse, ValueError]]: The step response of each heater, or the
+        error of a heater with no step, or more than one, in its additive noise.
     """
-    dataframe = pd.read_csv(file_path)
-    check_data(dataframe)
-    dataframe.set_index('TIME', inplace=True)
-    starting_time = dataframe.loc[dataframe['H1_ADD_NOISE'] > 0.0].index.values[0]
-    dataframe = dataframe.loc[starting_time:]
-    dataframe.index = (dataframe.index - starting_time) / 1000
-    return dataframe
+    columns = ['TIME'] + [f'H{heater}_TEMP' for heater in heaters] + [f'H{heater}_ADD_NOISE' for heater in heaters]
+    starting_time = dict.fromkeys(heaters)
+    step_values = {heater: set() for heater in heaters}
+    times = {heater: [] for heater in heaters}
+    temperatures = {heater: [] for heater in heaters}
+
+    for chunk in read_chunks(file_path, columns, chunk_size):
+        time = chunk['TIME'].to_numpy(dtype=np.float64)
+        for heater in heaters:
+            noise = chunk[f'H{heater}_ADD_NOISE'].to_numpy(dtype=np.float64)
+            step_values[heater].update(np.unique(noise[noise != 0]).tolist())
+            first = 0
+            if starting_time[heater] is None:
+                steps = np.flatnonzero(noise > 0)
+                if len(steps) == 0:
+                    continue
+                first = steps[0]
+                starting_time[heater] = time[first]
+            times[heater].append((time[first:] - starting_time[heater]) / 1000)
+            temperatures[heater].append(chunk[f'H{heater}_TEMP'].to_numpy(dtype=np.float64)[first:])
 
-def identification(dataframe: pd.DataFrame) -> Tuple[float, float, float, float, float]:
+    responses = dict()
+    for heater in heaters:
+        if starting_time[heater] is None or len(step_values[heater]) != 1:
+            responses[heater] = ValueError(f'The experiment is not a step response of heater {heater}')
+        else:
+            responses[heater] = StepResponse(np.concatenate(times[heater]), np.concatenate(temperatures[heater]), step_values[heater].pop())
+    return responses
+
+
+def load_step_responses(file_path: str, heaters: Sequence[int] = HEATERS, chunk_size: int = CHUNK_SIZE) -> Dict[int, StepResponse]:
     """
-    Calculate system parameters and extract relevant data.
+    Stream once through a log and extract the step response of each heater.
 
     Args:
-        dataframe (pd.DataFrame): The input data as a pandas DataFrame.
+        file_path (str): The path to the log file.
+        heaters (Sequence[int]): The heaters to extract.
+        chunk_size (int): The maximum number of rows read at a time.
 
     Returns:
-        Tuple[float, float, float, float, pd.DataFrame]: A tuple containing system parameters
-        (static_gain, time_delay, time_constant, step_power, initial_temperature)
+        Dict[int, StepResponse]: The step response of each heater.
+
+    Raises:
+        ValueError: If a heater has no step, or more than one, in its additive noise.
     """
+    responses = read_step_responses(file_path, heaters, chunk_size)
+    for response in responses.values():
+        if isinstance(response, ValueError):
+            raise response
+    return responses
+
 
-    initial_temperature = dataframe['H1_TEMP'].values[0]
-    dataframe.loc[:,'H1_TEMP'] = dataframe['H1_TEMP'] - initial_temperature
-    window = int(dataframe.index.max() / 10)
-    moving_average = dataframe.rolling(window).mean()
-    max_value = moving_average.max()[0]
+def identification(response: StepResponse) -> FOPDTModel:
+    """
+    Identify the FOPDT parameters of a step response.
 
-    step_power = dataframe.loc[dataframe['H1_ADD_NOISE'] > 0]['H1_ADD_NOISE'].values[0]
-    static_gain = round((max_value / step_power), 4)
-    time_delay = dataframe.loc[dataframe['H1_TEMP'] > 0.0].index.values[0]
-    time_constant = dataframe.loc[dataframe['H1_TEMP'] > (0.632 * max_value)].index.values[0] - time_delay
+    The static gain comes from the maximum of a moving average, with a window of a tenth of the
+    experiment duration in samples. The time delay is the first temperature rise, and the time
+    constant is the time to reach 63.2% of the final value, minus the time delay.
 
-    return static_gain, time_delay, time_constant, step_power, initial_temperature
+    Args:
+        response (StepResponse): The step response.
 
-def simulate_and_plot(
-        dataframe: pd.DataFrame,
-        static_gain: float,
-        time_delay: float,
-        time_constant: float,
-        step_power: float,
-        initial_temperature: float
- ):
+    Returns:
+        FOPDTModel: The identified model.
     """
-    Simulate the system and plot the results.
+    initial_temperature = response.temperature[0]
+    rise = response.temperature - initial_temperature
+    window = min(max(int(response.time.max() / 10), 1), len(rise))
+    accumulated = np.concatenate(([0.0], np.cumsum(rise)))
+    max_value = ((accumulated[window:] - accumulated[:-window]) / window).max()
+
+    static_gain = round(max_value / response.step_power, 4)
+    time_delay = response.time[np.argmax(rise > 0.0)]
+    time_constant = response.time[np.argmax(rise > 0.632 * max_value)] - time_delay
+    return FOPDTModel(static_gain, time_delay, time_constant, response.step_power, initial_temperature)
+
+
+def fopdt_step_response(time: np.ndarray, model: FOPDTModel) -> np.ndarray:
+    """
+    Evaluate the exact step response of a FOPDT model.
 
     Args:
-        dataframe (pd.DataFrame): The DataFrame containing the data.
-        static_gain (float): The system gain.
-        time_delay (float): The system time delay.
-        time_constant (float): The system time constant.
-        step_power (float): The system additive noise magnitude.
-        initial_temperature (float, optional): The vertical offset to apply to the y-values.
+        time (np.ndarray): Time since the step [s].
+        model (FOPDTModel): The model.
+
+    Returns:
+        np.ndarray: The temperature [ºC].
     """
+    elapsed = np.maximum(time - model.time_delay, 0.0)
+    return model.initial_temperature + model.static_gain * model.step_power * (1 - np.exp(-elapsed / max(model.time_constant, 1e-9)))
 
-    n_pade = 10
-    (num_pade, den_pade) = control.pade(time_delay, n_pade)
-    transfer_function_pade = control.tf(num_pade, den_pade)
 
-    num = [static_gain * step_power]
-    den = [time_constant, 1]
-    transfer_function = control.tf(num, den)
+def fit(response: StepResponse, model: FOPDTModel) -> FOPDTModel:
+    """
+    Refine an identified model by least squares on the whole step response.
 
-    transfer_function = control.series(transfer_function_pade, transfer_function)
+    Args:
+        response (StepResponse): The step response.
+        model (FOPDTModel): The initial guess, usually from identification().
 
-    sampling_interval = dataframe.index[1] - dataframe.index[0]
+    Returns:
+        FOPDTModel: The fitted model.
+    """
+    from scipy.optimize import least_squares
+
+    def residuals(parameters):
+        return fopdt_step_response(response.time, model._replace(static_gain=parameters[0], time_delay=parameters[1], time_constant=parameters[2])) - response.temperature
+
+    solution = least_squares(residuals, [model.static_gain, model.time_delay, max(model.time_constant, 1e-3)], bounds=([0, 0, 1e-3], [np.inf, np.inf, np.inf]))
+    static_gain, time_delay, time_constant = solution.x
+    return model._replace(static_gain=round(static_gain, 4), time_delay=round(time_delay, 3), time_constant=round(time_constant, 3))
 
-    t = np.arange(0, dataframe.index.max(), sampling_interval)
 
-    t, y = control.step_response(transfer_function, T=t)
-    y = y + initial_temperature
+def plot(response: StepResponse, model: FOPDTModel, output_path: Optional[str] = None):
+    """
+    Plot the step response with the identified model.
+
+    Args:
+        response (StepResponse): The step response.
+        model (FOPDTModel): The identified model.
+        output_path (str, optional): Saves the figure to this file instead of showing it.
+    """
+    import matplotlib
+    if output_path is not None:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
 
-    plt.figure(figsize=(10, 6))
-    plt.plot(dataframe['H1_TEMP'], label='Experiment data', linewidth=3)
-    plt.plot(t, y, label='Identified system')
+    static_gain, time_delay, time_constant, step_power, _ = model
+    figure = plt.figure(figsize=(10, 6))
+    plt.plot(response.time, response.temperature, label='Experiment data', linewidth=3)
+    plt.plot(response.time, fopdt_step_response(response.time, model), label='Identified system')
     plt.xlabel("Time [s]")
     plt.ylabel("Temperature [ºC]")
     expression = f'$G(s) = \\frac{{{static_gain}e^{{-{time_delay}s}}}}{{{time_constant}s + 1}}$'
@@ -113,25 +218,120 @@ def simulate_and_plot(
     plt.grid(color='b', linestyle='-', linewidth=0.1)
     legend_text = f'$K = {static_gain}$\n$L = {time_delay}$\n$\\tau = {time_constant}$\n$P = {step_power}$'
     plt.text(0.75, 0.2, legend_text, bbox=dict(facecolor='white', alpha=0.7), transform=plt.gca().transAxes)
-
     plt.legend()
-    plt.show()
+    if output_path is None:
+        plt.show()
+    else:
+        figure.savefig(output_path)
+        plt.close(figure)
 
-def main() -> None:
 
-    path = easygui.fileopenbox()
-    dataframe = load_data(path)
+def identify_file(file_path: str, heaters: Sequence[int] = HEATERS, do_fit: bool = False, plot_folder: Optional[str] = None, chunk_size: int = CHUNK_SIZE) -> List[dict]:
+    """
+    Identify every heater of one log. Errors are reported in the results instead of raised,
+    so one bad log does not stop a batch.
+
+    Returns:
+        List[dict]: One result per heater, with the RESULT_COLUMNS keys.
+    """
+    try:
+        responses = read_step_responses(file_path, heaters, chunk_size)
+    except Exception as error:
+        responses = dict.fromkeys(heaters, error)  # The log itself could not be read
+    results = list()
+    for heater in heaters:
+        result = dict.fromkeys(RESULT_COLUMNS, np.nan)
+        result.update(FILE=file_path, HEATER=heater, ERROR='')
+        try:
+            response = responses[heater]
+            if isinstance(response, Exception):
+                raise response
+            model = identification(response)
+            if do_fit:
+                model = fit(response, model)
+            result.update(zip(RESULT_COLUMNS[2:7], model))
+            if plot_folder is not None:
+                name = os.path.splitext(os.path.basename(file_path))[0]
+                plot(response, model, os.path.join(plot_folder, f'{name}_H{heater}.png'))
+        except Exception as error:
+            result['ERROR'] = str(error) or type(error).__name__
+        results.append(result)
+    return results
+
+
+def find_logs(paths: Sequence[str]) -> List[str]:
+    """
+    Expand folders into the log files they contain.
+    """
+    files = list()
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(LOG_EXTENSIONS)))
+        else:
+            files.append(path)
+    return files
+
+
+def identify_logs(paths: Sequence[str], heaters: Sequence[int] = HEATERS, do_fit: bool = False, plot_folder: Optional[str] = None, jobs: Optional[int] = None, chunk_size: int = CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Identify every heater of every log, one process per log.
+
+    Args:
+        paths (Sequence[str]): Log files or folders of log files.
+        heaters (Sequence[int]): The heaters to identify.
+        do_fit (bool): Refines the models by least squares.
+        plot_folder (str, optional): Saves one figure per log and heater in this folder.
+        jobs (int, optional): The number of processes (default: number of CPUs).
+        chunk_size (int): The maximum number of rows read at a time.
+
+    Returns:
+        pd.DataFrame: One row per log and heater.
+    """
+    files = find_logs(paths)
+    if plot_folder is not None:
+        os.makedirs(plot_folder, exist_ok=True)
+    results = list()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(identify_file, file, heaters, do_fit, plot_folder, chunk_size) for file in files]
+        for future in futures:
+            results.extend(future.result())
+    return pd.DataFrame(results, columns=RESULT_COLUMNS)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Identifies FOPDT models (K, L, τ) of the TeCoLab heaters from step response logs.')
+    parser.add_argument('paths', nargs='*', help='log files or folders of log files (default: choose one file in a dialog)')
+    parser.add_argument('--heaters', type=int, nargs='+', default=list(HEATERS), choices=HEATERS, help='heaters to identify (default: 1 2)')
+    parser.add_argument('--fit', action='store_true', help='refines the models by least squares')
+    parser.add_argument('--plot', default=None, help='folder where one figure per log and heater is saved')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='number of parallel processes (default: number of CPUs)')
+    parser.add_argument('-o', '--output', default=None, help='CSV file for the results (default: print them)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help=f'log rows read at a time (default {CHUNK_SIZE})')
+    args = parser.parse_args()
 
-    static_gain, time_delay, time_constant, step_power, initial_temperature = identification(dataframe.copy())
+    if not args.paths:
+        # Interactive use, as before: one log chosen in a dialog and the figures shown
+        import easygui
+        path = easygui.fileopenbox()
+        if path is None:
+            return
+        responses = read_step_responses(path, args.heaters, args.chunk_size)
+        for heater, response in responses.items():
+            if isinstance(response, ValueError):
+                print(response)
+                continue
+            model = identification(response)
+            if args.fit:
+                model = fit(response, model)
+            print(f'H{heater}:', model)
+            plot(response, model)
+        return
 
-    simulate_and_plot(
-        dataframe,
-        static_gain,
-        time_delay,
-        time_constant,
-        step_power,
-        initial_temperature
-    )
+    results = identify_logs(args.paths, args.heaters, args.fit, args.plot, args.jobs, args.chunk_size)
+    if args.output is None:
+        print(results.to_string(index=False))
+    else:
+        results.to_csv(args.output, index=False)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
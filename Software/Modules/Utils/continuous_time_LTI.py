@@ -21,6 +21,7 @@ SOFTWARE.
 '''
 
 from Modules.Utils.discrete_time_LTI import Controller
+from Modules.tecolab_discretization import discretize
 import control
 
 class Controller(Controller):
@@ -43,11 +44,12 @@ class Controller(Controller):
 		alpha = kwargs.get('alpha', None)
 		prewarp_frequency = kwargs.get('prewarp_frequency', None)
 		self.continuous_time_LTI_list.append(system)
-		print('CT system = ', system)
-		system = control.sample_system(system, self.discretization_period, method = method, alpha = alpha, prewarp_frequency = prewarp_frequency)
-		print('DT system = ', system)
-		self.discrete_time_LTI_list.append(system)
-		self._last_state.append(0)
+		discrete_system, matrices, cached = discretize(system, self.discretization_period, method = method, alpha = alpha, prewarp_frequency = prewarp_frequency)
+		if cached == False:
+			print('CT system = ', system)
+			print('DT system = ', discrete_system)
+		self.discrete_time_LTI_list.append(discrete_system)
+		self._cache_LTI(discrete_system, matrices)
 		self._last_index = self._last_index + 1
 		return self._last_index
 
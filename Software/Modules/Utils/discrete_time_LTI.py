@@ -21,7 +21,9 @@ SOFTWARE.
 '''
 
 from Modules.Utils.periodic_controller import Controller
+from Modules.tecolab_discretization import stateSpaceMatrices
 import control
+import numpy as np
 
 class Controller(Controller):
 	def __init__(self):
@@ -29,6 +31,16 @@ class Controller(Controller):
 		self.discrete_time_LTI_list = list()
 		self._last_state = list()
 		self._last_index = -1;
+		self._A = list()
+		self._B = list()
+		self._C = list()
+		self._D = list()
+		self._state = np.zeros(0)
+		self._stacked_A = np.zeros((0, 0))
+		self._stacked_B = np.zeros((0, 0))
+		self._stacked_C = np.zeros((0, 0))
+		self._stacked_D = np.zeros(0)
+		self.LTI_stepping = 'interval'
 
 	def set_LTI(self, system):
 		if control.isdtime(system) == False:
@@ -37,9 +49,18 @@ class Controller(Controller):
 		system = control.ss(system)
 		self._last_index = self._last_index + 1
 		self.discrete_time_LTI_list.append(system)
-		self._last_state.append(0)
+		self._cache_LTI(system)
 		return self._last_index
 
+	def set_LTI_stepping(self, stepping: str):
+		# 'interval' (default): each LTI_compute() call advances one time unit, 1/dt samples.
+		# 'sample': each call advances one sample, which changes the tuning of existing controllers.
+		# Applies to the LTI systems stored after the call.
+		if stepping not in ('interval', 'sample'):
+			print("ERROR at discrete_time_LTI module, set_LTI_stepping method: stepping argument must be 'interval' or 'sample'.")
+			exit()
+		self.LTI_stepping = stepping
+
 	def get_LTI(self, index: int):
 		if (index < 0):
 			print('ERROR at discrete_time_LTI module, get_LTI method: index argument must be a nonnegative number.')
@@ -56,6 +77,65 @@ class Controller(Controller):
 		if (index > self._last_index):
 			print('ERROR at discrete_time_LTI module, LTI_compute method: index argument out of bounds.')
 			exit()
-		(_, output, X) = control.forced_response(self.discrete_time_LTI_list[index], T = [0, 1], U = [u, u], X0 = self._last_state[index], return_x = True)
-		self._last_state[index] = [ls[1] for ls in X]
-		return output[0]
\ No newline at end of file
+		x = self._last_state[index]
+		output = self._C[index] @ x + self._D[index]*u
+		x[:] = self._A[index] @ x + self._B[index]*u
+		return output
+
+	def LTI_compute_all(self, u):
+		# Updates every stored LTI system at once through their block-diagonal union.
+		# u[i] is the input of the system with index i and the outputs follow the same order.
+		u = np.asarray(u, dtype = float)
+		if (u.shape != self._stacked_D.shape):
+			print('ERROR at discrete_time_LTI module, LTI_compute_all method: u argument must have one input per stored LTI system.')
+			exit()
+		output = self._stacked_C @ self._state + self._stacked_D*u
+		self._state[:] = self._stacked_A @ self._state + self._stacked_B @ u
+		return output
+
+	def _cache_LTI(self, system, matrices = None):
+		# Keeps the state-space matrices of the SISO system as contiguous arrays, so that
+		# LTI_compute() steps x' = Ax + Bu, y = Cx + Du without calling the control library.
+		# The matrices of a discretization cache hit are shared read-only arrays.
+		A, B, C, D = matrices if matrices is not None else stateSpaceMatrices(system)
+		A, B = self._interval_matrices(system, A, B)
+		self._A.append(A)
+		self._B.append(B)
+		self._C.append(C)
+		self._D.append(D)
+		self._last_state.append(np.zeros(len(A)))
+		self._stack_LTI()
+
+	def _stack_LTI(self):
+		# Builds the block-diagonal system used by LTI_compute_all(). The states of all systems
+		# live in one vector and _last_state holds views of it, so both methods share the states.
+		orders = [len(x) for x in self._last_state]
+		offsets = np.concatenate(([0], np.cumsum(orders))).astype(int)
+		blocks = len(orders)
+		self._state = np.concatenate(self._last_state) if blocks > 0 else np.zeros(0)
+		self._stacked_A = np.zeros((offsets[-1], offsets[-1]))
+		self._stacked_B = np.zeros((offsets[-1], blocks))
+		self._stacked_C = np.zeros((blocks, offsets[-1]))
+		self._stacked_D = np.array(self._D, dtype = float)
+		for i in range(blocks):
+			states = slice(offsets[i], offsets[i + 1])
+			self._stacked_A[states, states] = self._A[i]
+			self._stacked_B[states, i] = self._B[i]
+			self._stacked_C[i, states] = self._C[i]
+			self._last_state[i] = self._state[states]
+
+	def _interval_matrices(self, system, A, B):
+		# Each LTI_compute() call advances the state over one time unit with the input held, as
+		# control.forced_response over T = [0, 1] did: 1/dt samples, e.g. 5 for dt = 0.2
+		if self.LTI_stepping == 'sample':
+			return A, B
+		samples = 1 if system.dt is True else round(1/system.dt)
+		if (samples < 1) or (abs(samples*system.dt - 1) > 1e-9):
+			print('ERROR at discrete_time_LTI module, set_LTI method: system sampling time must divide 1.')
+			exit()
+		if samples == 1:
+			return A, B
+		powers = [np.eye(len(A))]
+		for _ in range(samples - 1):
+			powers.append(A @ powers[-1])
+		return np.ascontiguousarray(A @ powers[-1]), np.ascontiguousarray(sum(powers) @ B)
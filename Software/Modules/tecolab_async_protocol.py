@@ -0,0 +1,139 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import asyncio
+import struct
+from Modules.tecolab_communication_protocol import computeCheckSum, getLinkStatistics, getFrameEncoder, isFrameValid, MAX_RETRIES, _checkDeviceError, _checkedTemperatures
+from Modules.tecolab_codec import READ_TEMPERATURES_FRAME, TEMPERATURE_FRAME_LENGTH
+
+POLL_INTERVAL = 0.001 # [s] Used when the device has no file descriptor to watch
+
+class AsyncTeCoLab:
+	# Asyncio transport for a TeCoLab device (a serial.Serial or any object with the same
+	# read/write/in_waiting interface). Each request gets a future that is resolved when its
+	# answer frame is complete, so the event loop keeps running while the board answers.
+	# Requests are sent one at a time because the firmware handles one message per read.
+	def __init__(self, tecolab, timeout: float = 0.10):
+		self.tecolab = tecolab
+		self.name = tecolab.name
+		self.timeout = timeout # [s]
+		self._buffer = bytearray()
+		self._expected = None # (answer length, future)
+		self._lock = None
+		self._loop = None
+		self._fileno = None
+		self.statistics = getLinkStatistics(tecolab) # Shared with the blocking protocol functions
+
+	async def open(self):
+		self._loop = asyncio.get_running_loop()
+		self._lock = asyncio.Lock()
+		try:
+			self._fileno = self.tecolab.fileno()
+			self.tecolab.timeout = 0 # Non-blocking reads, the event loop tells when data arrives
+			self._loop.add_reader(self._fileno, self._onReadable)
+		except (AttributeError, NotImplementedError, OSError, ValueError):
+			self._fileno = None # Polled while a request is pending
+		return self
+
+	async def close(self):
+		if self._fileno is not None:
+			self._loop.remove_reader(self._fileno)
+		self.tecolab.close()
+
+	async def __aenter__(self):
+		return await self.open()
+
+	async def __aexit__(self, *exc):
+		await self.close()
+
+	async def ping(self):
+		return (await self._request(b"AA", 2)) == b"AA"
+
+	async def readBytes(self, address: int, quantity: int):
+		serialMessage = b"R" + struct.pack('>B', address) + struct.pack('>B', quantity)
+		serialMessage = serialMessage + struct.pack('>B', computeCheckSum(serialMessage))
+		return await self._request(serialMessage, quantity + 2)
+
+	async def readTemperatures(self):
+		return _checkedTemperatures(self.tecolab, await self._request(READ_TEMPERATURES_FRAME, TEMPERATURE_FRAME_LENGTH))
+
+	async def writePWMs(self, controlAction):
+		# Copied because another task may encode a frame while this one waits for the device
+		return await self._request(bytes(getFrameEncoder(self.tecolab).writePWMs(controlAction)), 2)
+
+	async def controlCycle(self, controlAction):
+		return _checkedTemperatures(self.tecolab, await self._request(bytes(getFrameEncoder(self.tecolab).controlCycle(controlAction)), TEMPERATURE_FRAME_LENGTH))
+
+	async def _request(self, serialMessage, length):
+		# Returns the validated answer, or None after MAX_RETRIES failed retries
+		async with self._lock:
+			for attempt in range(MAX_RETRIES + 1):
+				if attempt > 0:
+					self.statistics.retries = self.statistics.retries + 1
+				if self._buffer:
+					self._resync() # Late answer of an earlier request
+				future = self._loop.create_future()
+				self._expected = (length, future)
+				self.tecolab.write(serialMessage)
+				try:
+					answer = await asyncio.wait_for(self._answer(future), self.timeout)
+				except asyncio.TimeoutError:
+					self.statistics.timeouts = self.statistics.timeouts + 1
+					self._resync()
+					continue
+				finally:
+					self._expected = None
+				if isFrameValid(answer, length):
+					self.statistics.frames = self.statistics.frames + 1
+					_checkDeviceError(self.statistics, serialMessage, answer)
+					return answer
+				self.statistics.checksum_errors = self.statistics.checksum_errors + 1
+				self._resync()
+			self.statistics.failures = self.statistics.failures + 1
+			return None
+
+	def _resync(self):
+		# Drops the bytes received so far so that the next answer starts at a frame boundary
+		self.statistics.resyncs = self.statistics.resyncs + 1
+		self._buffer.clear()
+		self.tecolab.reset_input_buffer()
+
+	def _onReadable(self):
+		self._onData(self.tecolab.read(self.tecolab.in_waiting or 1))
+
+	async def _answer(self, future):
+		while self._fileno is None and not future.done():
+			if self.tecolab.in_waiting:
+				self._onData(self.tecolab.read(self.tecolab.in_waiting))
+			else:
+				await asyncio.sleep(POLL_INTERVAL)
+		return await future
+
+	def _onData(self, data):
+		self._buffer.extend(data)
+		if self._expected is None:
+			return
+		length, future = self._expected
+		if len(self._buffer) >= length and not future.done():
+			future.set_result(bytes(self._buffer[:length]))
+			del self._buffer[:length]
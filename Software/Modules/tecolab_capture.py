@@ -0,0 +1,156 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import struct
+import time
+import numpy as np
+
+# Capture file: a short header followed by fixed-size records, which can be memory-mapped
+CAPTURE_HEADER = b"TECOLABCAPTURE01"
+CAPTURE_DATA_SIZE = 22 # Longest firmware message (4 + MAXQTYBYTES) rounded up to a 32-byte record
+CAPTURE_RECORD = np.dtype([('time', '<i8'), ('direction', 'u1'), ('length', 'u1'), ('data', 'u1', (CAPTURE_DATA_SIZE,))])
+DIRECTION_TX = 0 # Host to board
+DIRECTION_RX = 1 # Board to host
+
+_record = struct.Struct(f'<qBB{CAPTURE_DATA_SIZE}s') # Same layout as CAPTURE_RECORD
+
+class CaptureDevice:
+	# Wraps a TeCoLab device (serial.Serial, simulator, ...) and appends every frame written to
+	# or read from it, with a nanosecond timestamp, to a capture file
+	def __init__(self, tecolab, path: str, clock = None):
+		self.tecolab = tecolab
+		self.path = path
+		self.clock = clock
+		self._file = open(path, 'wb')
+		self._file.write(CAPTURE_HEADER)
+
+	def __getattr__(self, name):
+		return getattr(self.tecolab, name)
+
+	@property
+	def timeout(self):
+		return self.tecolab.timeout
+
+	@timeout.setter
+	def timeout(self, value):
+		self.tecolab.timeout = value
+
+	def write(self, data):
+		self._append(DIRECTION_TX, data)
+		return self.tecolab.write(data)
+
+	def read(self, size: int = 1):
+		data = self.tecolab.read(size)
+		if data:
+			self._append(DIRECTION_RX, data)
+		return data
+
+	def close(self):
+		if not self._file.closed:
+			self._file.close()
+		self.tecolab.close()
+
+	def _append(self, direction, data):
+		now = self.clock.monotonic_ns() if self.clock is not None else time.monotonic_ns()
+		for i in range(0, len(data), CAPTURE_DATA_SIZE):
+			chunk = bytes(data[i:i + CAPTURE_DATA_SIZE])
+			self._file.write(_record.pack(now, direction, len(chunk), chunk))
+		self._file.flush() # A crash keeps every frame up to the last one
+
+def readCapture(path: str):
+	# Memory-maps the records of a capture file
+	with open(path, 'rb') as file:
+		if file.read(len(CAPTURE_HEADER)) != CAPTURE_HEADER:
+			raise ValueError(f'{path} is not a TeCoLab capture file')
+	return np.memmap(path, dtype = CAPTURE_RECORD, mode = 'r', offset = len(CAPTURE_HEADER))
+
+def captureStream(records, direction: int):
+	# Concatenates the raw bytes sent in one direction. Answers of different lengths and the
+	# partial answers of a faulty link are mixed in it, use captureFrames() to decode answers.
+	records = records[records['direction'] == direction]
+	mask = np.arange(CAPTURE_DATA_SIZE) < records['length'][:, None]
+	return records['data'][mask].tobytes()
+
+def captureFrames(records, length: int, direction: int = DIRECTION_RX):
+	# (N, length) array of the records holding exactly one frame of the given length, e.g. the
+	# temperature answers for tecolab_codec.decodeTemperatureFrames(). Each answer is read with a
+	# single read() of its length, so a short or partial read never shifts the following frames.
+	records = records[(records['direction'] == direction) & (records['length'] == length)]
+	return records['data'][:, :length]
+
+class ReplayDevice:
+	# Plays a capture file back as a TeCoLab device. Each write consumes the next recorded
+	# request and makes the answers recorded after it available to read. With speed = 0 the
+	# answers are available immediately, otherwise the recorded timing is scaled by 1/speed.
+	def __init__(self, path: str, speed: float = 0):
+		self.name = f'Replay of {path}'
+		self.records = readCapture(path)
+		self.speed = speed
+		self.timeout = 0
+		self.mismatches = 0 # Requests that differ from the recorded ones
+		self._cursor = 0
+		self._answer = bytearray()
+		self._time_origin = None # (recorded time, wall time) of the first request
+
+	@property
+	def in_waiting(self):
+		return len(self._answer)
+
+	def write(self, data):
+		records = self.records
+		while self._cursor < len(records) and records['direction'][self._cursor] != DIRECTION_TX:
+			self._cursor = self._cursor + 1
+		if self._cursor >= len(records):
+			return len(data)
+		recorded = bytearray()
+		while self._cursor < len(records) and records['direction'][self._cursor] == DIRECTION_TX and len(recorded) < len(data):
+			recorded.extend(records['data'][self._cursor][:records['length'][self._cursor]].tobytes())
+			self._cursor = self._cursor + 1
+		if recorded != bytes(data):
+			self.mismatches = self.mismatches + 1
+		self._waitRecordedTime(int(records['time'][self._cursor - 1]))
+		while self._cursor < len(records) and records['direction'][self._cursor] == DIRECTION_RX:
+			self._answer.extend(records['data'][self._cursor][:records['length'][self._cursor]].tobytes())
+			self._cursor = self._cursor + 1
+		return len(data)
+
+	def read(self, size: int = 1):
+		answer = bytes(self._answer[:size])
+		del self._answer[:size]
+		return answer
+
+	def reset_input_buffer(self):
+		self._answer.clear()
+
+	def close(self):
+		pass
+
+	def _waitRecordedTime(self, recorded_time):
+		if self.speed <= 0:
+			return
+		now = time.monotonic_ns()
+		if self._time_origin is None:
+			self._time_origin = (recorded_time, now)
+		deadline = self._time_origin[1] + (recorded_time - self._time_origin[0])/self.speed
+		if deadline > now:
+			time.sleep((deadline - now)/1e9)
@@ -0,0 +1,71 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import time
+
+SPIN_TIME = 2000000 # [ns] Busy-wait before a deadline to absorb the sleep inaccuracy of the OS
+
+class SystemClock:
+	def monotonic_ns(self):
+		return time.monotonic_ns()
+
+	def millis(self):
+		return time.monotonic_ns()//1000000
+
+	def wait_until(self, deadline: int):
+		# Sleeps until shortly before the deadline [ns] and spins for the rest
+		remaining = deadline - time.monotonic_ns()
+		if remaining > SPIN_TIME:
+			time.sleep((remaining - SPIN_TIME)/1e9)
+		while time.monotonic_ns() < deadline:
+			pass
+
+	async def wait_until_async(self, deadline: int):
+		# No final spin here, it would stall the other tasks of the event loop
+		import asyncio
+		remaining = deadline - time.monotonic_ns()
+		await asyncio.sleep(max(remaining, 0)/1e9)
+
+class VirtualClock:
+	def __init__(self):
+		# Simulated time in nanoseconds, which only moves when the experiment waits
+		self.time = 0
+
+	def monotonic_ns(self):
+		return self.time
+
+	def millis(self):
+		return self.time//1000000
+
+	def wait_until(self, deadline: int):
+		if deadline > self.time:
+			self.time = deadline
+
+	async def wait_until_async(self, deadline: int):
+		import asyncio
+		self.wait_until(deadline)
+		await asyncio.sleep(0)
+
+	def advance(self, milliseconds):
+		if milliseconds > 0:
+			self.time = self.time + round(milliseconds*1000000)
@@ -0,0 +1,82 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import struct
+import numpy as np
+
+# Answer of the 'R' (address 0, 6 bytes) and 'C' commands: error byte, ambient, heater 1 and
+# heater 2 temperatures as little-endian words (sign bit and magnitude in hundredths of °C) and checksum
+TEMPERATURE_FRAME = struct.Struct('<B3HB')
+TEMPERATURE_FRAME_LENGTH = TEMPERATURE_FRAME.size
+
+# Temperature of every possible 16-bit word, shared by the scalar and the vectorized decoders
+_words = np.arange(1 << 16, dtype = np.int64)
+TEMPERATURE_TABLE = np.where(_words >> 15, -((_words & 0x7FFF)/100), _words/100)
+_TEMPERATURE_LIST = TEMPERATURE_TABLE.tolist()
+del _words
+
+READ_TEMPERATURES_FRAME = bytes([ord('R'), 0x00, 0x06, (ord('R') + 0x06) & 0xFF])
+
+def encodePWM(value):
+	# Percentage to PWM byte, with the same clipping and rounding as np.clip followed by round()
+	return int(round(min(max(value*255/100, 0), 255)))
+
+def decodeTemperatures(frame):
+	# Returns (heater 1, heater 2, ambient) from a temperature answer with a single unpack
+	_, ambient, heater_1, heater_2, _ = TEMPERATURE_FRAME.unpack(frame)
+	return _TEMPERATURE_LIST[heater_1], _TEMPERATURE_LIST[heater_2], _TEMPERATURE_LIST[ambient]
+
+def decodeTemperatureFrames(data):
+	# Vectorized decoder for temperature answers, given as an (N, 8) array (e.g. from
+	# tecolab_capture.captureFrames()) or as bytes of back-to-back answers with nothing else
+	# between them. Returns the (N, 3) temperatures as (heater 1, heater 2, ambient), the error
+	# bytes and a mask of the frames whose checksum is correct.
+	if isinstance(data, np.ndarray) and data.ndim == 2:
+		frames = data
+	else:
+		frames = np.frombuffer(data, dtype = np.uint8)
+		frames = frames[:len(frames) - len(frames) % TEMPERATURE_FRAME_LENGTH].reshape(-1, TEMPERATURE_FRAME_LENGTH)
+	words = frames[:, 1:7:2].astype(np.int64) | (frames[:, 2:7:2].astype(np.int64) << 8)
+	temperatures = TEMPERATURE_TABLE[words[:, [1, 2, 0]]]
+	valid = (frames[:, :-1].sum(axis = 1, dtype = np.int64) & 0xFF) == frames[:, -1]
+	return temperatures, frames[:, 0].copy(), valid
+
+class FrameEncoder:
+	# Preallocated 'W' and 'C' frames that are filled in place. The returned buffer is reused by
+	# the next call, so it must be written to the device before encoding another frame.
+	def __init__(self):
+		self.write_frame = bytearray(b"W\x06\x03\x00\x00\x00\x00")
+		self.control_frame = bytearray(b"C\x00\x00\x00\x00")
+
+	def writePWMs(self, controlAction):
+		return self._fill(self.write_frame, 3, controlAction)
+
+	def controlCycle(self, controlAction):
+		return self._fill(self.control_frame, 1, controlAction)
+
+	def _fill(self, frame, offset, controlAction):
+		frame[offset] = encodePWM(controlAction[0])
+		frame[offset + 1] = encodePWM(controlAction[1])
+		frame[offset + 2] = encodePWM(controlAction[2])
+		frame[-1] = sum(memoryview(frame)[:-1]) & 0xFF
+		return frame
@@ -21,6 +21,7 @@ SOFTWARE.
 '''
 
 import argparse
+from Modules.tecolab_logger import LOG_FORMATS
 
 ## Other messages
 VERSION = 'TeCoLab version: alpha'
@@ -28,6 +29,12 @@ EXPFILEHELP = 'experiment file name in Experiments folder without extension'
 CONTMODULEHELP = 'controller module name in Controllers folder without extension'
 VERSIONHELP = 'shows TeCoLab version'
 PERIODHELP = 'chooses TeCoLab sampling period (default 200)'
+SIMULATEHELP = 'runs the experiment on a simulated TeCoLab device, faster than real time'
+REALTIMEHELP = 'runs the simulated or replayed TeCoLab device in real time'
+CAPTUREHELP = 'records the raw serial traffic to the given capture file'
+REPLAYHELP = 'replays the given capture file instead of using a TeCoLab device'
+LOGFORMATHELP = 'log file format (default csv)'
+TELEMETRYHELP = 'publishes the logged samples on a UNIX socket path or a local TCP [HOST:]PORT'
 
 def getParameters():
 	parser = argparse.ArgumentParser()
@@ -35,6 +42,12 @@ def getParameters():
 	parser.add_argument('ControllerModuleName', help = CONTMODULEHELP)
 	parser.add_argument('-v', help = VERSIONHELP, action = 'store_true')
 	parser.add_argument('-t', '--period', type = int, default = 200, help = PERIODHELP)
+	parser.add_argument('-s', '--simulate', help = SIMULATEHELP, action = 'store_true')
+	parser.add_argument('--realtime', help = REALTIMEHELP, action = 'store_true')
+	parser.add_argument('--capture', default = None, help = CAPTUREHELP)
+	parser.add_argument('--replay', default = None, help = REPLAYHELP)
+	parser.add_argument('-l', '--log-format', default = 'csv', choices = list(LOG_FORMATS), help = LOGFORMATHELP)
+	parser.add_argument('--telemetry', default = None, help = TELEMETRYHELP)
 	
 	if parser.parse_args().v:
 		print(VERSION)
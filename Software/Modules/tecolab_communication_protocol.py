@@ -20,40 +20,16 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 '''
 
-import serial
-import serial.tools.list_ports
-import time
-import numpy as np
-import struct
+import weakref
 from Modules.tecolab_messages import TecolabMessages
+from Modules.tecolab_port_search import searchTeCoLabPort, searchTeCoLabPorts
+from Modules.tecolab_codec import FrameEncoder, decodeTemperatures, READ_TEMPERATURES_FRAME, TEMPERATURE_FRAME_LENGTH
 
-def searchTeCoLabPort():
-	## Check connected serial ports
-	ports = serial.tools.list_ports.comports()
-	if ports:
-		print(TecolabMessages.Message4.value)
-		for port, desc, hwid in sorted(ports):
-		   	print("{}: {} [{}]".format(port, desc, hwid))
-	else:
-		print(TecolabMessages.Message5.value)
-		return False
-	## Search for TeCoLab device
-	print(TecolabMessages.Message6.value)
-	for port, desc, hwid in sorted(ports):
-		try:
-			ser = serial.Serial(port, 115200, timeout = 0.10, write_timeout = 1.00)
-			time.sleep(4)
-			print(TecolabMessages.Message7.value, '{}'.format(ser.name))
-			ser.write(b"AA")
-			ans = ser.read(2)
-		except:
-			ans = None
-		if ans == b"AA":
-			print(TecolabMessages.Message8.value, '{}'.format(ser.name))
-			return ser
-		else:
-			ser.close()
-	return False
+MAX_RETRIES = 2 # Retries of a request whose answer is missing or corrupted
+
+class TeCoLabLinkError(Exception):
+	# The device gave no valid answer and no earlier temperatures can stand in for it
+	pass
 
 def computeCheckSum(data):
 	checksum = 0
@@ -62,28 +38,105 @@ def computeCheckSum(data):
 	checksum = checksum & 0xFF
 	return checksum
 
+class LinkStatistics:
+	# Error counters of the serial link with one TeCoLab device
+	def __init__(self):
+		self.frames = 0
+		self.checksum_errors = 0
+		self.timeouts = 0
+		self.resyncs = 0
+		self.retries = 0
+		self.failures = 0
+		self.device_errors = 0
+		self.last_device_error = 0
+		self.temperatures = None # Last valid temperatures, used when a request fails
+
+	def summary(self):
+		return {
+			'FRAMES': self.frames,
+			'CHECKSUM_ERRORS': self.checksum_errors,
+			'TIMEOUTS': self.timeouts,
+			'RESYNCS': self.resyncs,
+			'RETRIES': self.retries,
+			'FAILURES': self.failures,
+			'DEVICE_ERRORS': self.device_errors,
+		}
+
+_link_statistics = weakref.WeakKeyDictionary()
+_frame_encoders = weakref.WeakKeyDictionary()
+
+def getLinkStatistics(tecolab):
+	statistics = _link_statistics.get(tecolab)
+	if statistics is None:
+		statistics = LinkStatistics()
+		_link_statistics[tecolab] = statistics
+	return statistics
+
 def readTemperatures(tecolab):
-	serialMessage = b"R" + struct.pack('>B', 0x00) + struct.pack('>B', 0x06)
-	serialMessage = serialMessage + struct.pack('>B', computeCheckSum(serialMessage))
-	tecolab.write(serialMessage)
-
-	tempMessage = tecolab.read(8)
-	error = tempMessage[0]
-	TAmsignal = 1 - 2*(tempMessage[2] >> 7)
-	TemperatureAm = TAmsignal * (((tempMessage[2] & 0x7F)*(2**8) + tempMessage[1]) / 100)
-	TH1signal = 1 - 2*(tempMessage[4] >> 7)
-	TemperatureH1 = TH1signal * (((tempMessage[4] & 0x7F)*(2**8) + tempMessage[3]) / 100)
-	TH2signal = 1 - 2*(tempMessage[6] >> 7)
-	TemperatureH2 = TH2signal * (((tempMessage[6] & 0x7F)*(2**8) + tempMessage[5]) / 100)
-	ChSum = tempMessage[7]
-
-	return TemperatureH1, TemperatureH2, TemperatureAm
+	return _checkedTemperatures(tecolab, _exchange(tecolab, READ_TEMPERATURES_FRAME, TEMPERATURE_FRAME_LENGTH))
 
 def writePWMs(tecolab, controlAction):
-	H1 = int(round(np.clip(controlAction[0]*255/100, 0, 255)))
-	H2 = int(round(np.clip(controlAction[1]*255/100, 0, 255)))
-	Co = int(round(np.clip(controlAction[2]*255/100, 0, 255)))
-	serialMessage = b"W" + struct.pack('>B', 0x06) + struct.pack('>B', 0x03) + struct.pack('>B', H1) + struct.pack('>B', H2) + struct.pack('>B', Co)
-	serialMessage = serialMessage + struct.pack('>B', computeCheckSum(serialMessage))
-	tecolab.write(serialMessage)
-	return tecolab.read(2)
\ No newline at end of file
+	return _exchange(tecolab, getFrameEncoder(tecolab).writePWMs(controlAction), 2)
+
+def controlCycle(tecolab, controlAction):
+	# Writes the PWMs and reads the temperatures in a single round trip
+	return _checkedTemperatures(tecolab, _exchange(tecolab, getFrameEncoder(tecolab).controlCycle(controlAction), TEMPERATURE_FRAME_LENGTH))
+
+def getFrameEncoder(tecolab):
+	# One set of preallocated frames per device, so boards driven from different threads never share them
+	encoder = _frame_encoders.get(tecolab)
+	if encoder is None:
+		encoder = FrameEncoder()
+		_frame_encoders[tecolab] = encoder
+	return encoder
+
+def isFrameValid(frame, length: int):
+	# Every answer of the firmware ends with the checksum of the previous bytes
+	return frame is not None and len(frame) == length and computeCheckSum(frame[:-1]) == frame[-1]
+
+def _exchange(tecolab, serialMessage, length):
+	# Sends the message and returns its validated answer, or None after MAX_RETRIES failed retries.
+	# Short and corrupted answers discard whatever is left in the input buffer before the retry,
+	# so the next answer starts at a frame boundary again.
+	statistics = getLinkStatistics(tecolab)
+	for attempt in range(MAX_RETRIES + 1):
+		if attempt > 0:
+			statistics.retries = statistics.retries + 1
+		if tecolab.in_waiting:
+			_resync(tecolab, statistics) # Late answer of an earlier request
+		tecolab.write(serialMessage)
+		answer = tecolab.read(length)
+		if len(answer) < length:
+			statistics.timeouts = statistics.timeouts + 1
+			_resync(tecolab, statistics)
+		elif not isFrameValid(answer, length):
+			statistics.checksum_errors = statistics.checksum_errors + 1
+			_resync(tecolab, statistics)
+		else:
+			statistics.frames = statistics.frames + 1
+			_checkDeviceError(statistics, serialMessage, answer)
+			return answer
+	statistics.failures = statistics.failures + 1
+	return None
+
+def _resync(tecolab, statistics):
+	statistics.resyncs = statistics.resyncs + 1
+	tecolab.reset_input_buffer()
+
+def _checkDeviceError(statistics, serialMessage, answer):
+	# The first byte of the 'R', 'W' and 'C' answers is the firmware error byte
+	if serialMessage[:1] == b"A" or answer[0] == 0x00:
+		return
+	if statistics.device_errors == 0:
+		print(TecolabMessages.WarningMessage3.value, hex(answer[0]))
+	statistics.device_errors = statistics.device_errors + 1
+	statistics.last_device_error = answer[0]
+
+def _checkedTemperatures(tecolab, answer):
+	# Holds the last valid temperatures when the request failed
+	statistics = getLinkStatistics(tecolab)
+	if answer is not None:
+		statistics.temperatures = decodeTemperatures(answer)
+	elif statistics.temperatures is None:
+		raise TeCoLabLinkError(f"{TecolabMessages.ErrorMessage12.value} {getattr(tecolab, 'name', '')}")
+	return statistics.temperatures
@@ -56,9 +56,9 @@ class Controller:
 		self.actuator_heater_2 = []
 		self.actuator_fan = []
 		control_signal = 0
-		t_1 = round(time.time()*1000)
+		t_1 = time.perf_counter_ns()
 		if (self.control_signal() == True):
 			control_signal = 1
 			self.control_action()
-		t_2 = round(time.time()*1000)
-		return (self.actuator_heater_1, self.actuator_heater_2, self.actuator_fan), control_signal, (t_2 - t_1)
\ No newline at end of file
+		t_2 = time.perf_counter_ns()
+		return (self.actuator_heater_1, self.actuator_heater_2, self.actuator_fan), control_signal, (t_2 - t_1)/1e6 # [ms]
\ No newline at end of file
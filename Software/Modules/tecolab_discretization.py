@@ -0,0 +1,122 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import collections
+import hashlib
+import os
+import pathlib
+import threading
+import numpy as np
+import control
+
+# Memoized control.sample_system(): repeated controllers (e.g. parameter sweeps) reuse the
+# discretization of identical blocks instead of computing it again. Results are kept in an
+# in-process LRU and, when a folder is set, in one .npz file per block shared by all processes.
+DISCRETIZATION_CACHE_SIZE = 256 # Blocks kept in memory
+DISCRETIZATION_CACHE_VARIABLE = 'TECOLAB_DISCRETIZATION_CACHE' # Environment variable with the on-disk cache folder
+
+_cache = collections.OrderedDict()
+_cache_lock = threading.Lock()
+_cache_folder = os.environ.get(DISCRETIZATION_CACHE_VARIABLE) or None
+
+def setDiscretizationCacheFolder(folder):
+	# Enables the on-disk cache in the given folder, or disables it with None
+	global _cache_folder
+	_cache_folder = folder
+
+def discretize(system, period: float, method: str = 'zoh', alpha = None, prewarp_frequency = None):
+	# Returns the discrete-time system, its state-space matrices (A, B, C, D) as stored by
+	# discrete_time_LTI, and whether it came from the cache. The cached objects are shared
+	# and must not be modified.
+	key = (_systemKey(system), float(period), method, alpha, prewarp_frequency)
+	with _cache_lock:
+		entry = _cache.get(key)
+		if entry is not None:
+			_cache.move_to_end(key)
+			return entry + (True,)
+	entry = _loadEntry(key)
+	cached = entry is not None
+	if not cached:
+		discrete = control.sample_system(system, period, method = method, alpha = alpha, prewarp_frequency = prewarp_frequency)
+		entry = (discrete, stateSpaceMatrices(discrete))
+		_saveEntry(key, entry)
+	with _cache_lock:
+		_cache[key] = entry
+		while len(_cache) > DISCRETIZATION_CACHE_SIZE:
+			_cache.popitem(last = False)
+	return entry + (cached,)
+
+def stateSpaceMatrices(system):
+	# A, B and C of a SISO system as read-only contiguous arrays (B and C flattened) and D as a float
+	system = control.ss(system)
+	matrices = (np.array(system.A, dtype = float), np.array(system.B[:, 0], dtype = float), np.array(system.C[0, :], dtype = float))
+	for matrix in matrices:
+		matrix.flags.writeable = False
+	return matrices + (float(system.D[0, 0]),)
+
+def _systemKey(system):
+	if isinstance(system, control.TransferFunction) and system.ninputs == 1 and system.noutputs == 1:
+		return ('tf', tuple(np.ravel(system.num[0][0]).tolist()), tuple(np.ravel(system.den[0][0]).tolist()))
+	system = control.ss(system)
+	return ('ss', np.shape(system.A), tuple(np.ravel(system.A).tolist()), tuple(np.ravel(system.B).tolist()), tuple(np.ravel(system.C).tolist()), tuple(np.ravel(system.D).tolist()))
+
+def _entryPath(key):
+	return pathlib.Path(_cache_folder)/(hashlib.sha256(repr(key).encode()).hexdigest()[:32] + '.npz')
+
+def _loadEntry(key):
+	if _cache_folder is None:
+		return None
+	try:
+		with np.load(_entryPath(key)) as data:
+			if data['key'].item() != repr(key):
+				return None
+			dt = data['dt'].item()
+			if 'num' in data:
+				discrete = control.tf(data['num'], data['den'], dt)
+			else:
+				discrete = control.ss(data['A'], data['B'][:, None], data['C'][None, :], data['D'].item(), dt)
+			matrices = (data['A'], data['B'], data['C'], float(data['D']))
+	except (OSError, KeyError, ValueError):
+		return None
+	for matrix in matrices[:3]:
+		matrix.flags.writeable = False
+	return discrete, matrices
+
+def _saveEntry(key, entry):
+	if _cache_folder is None:
+		return
+	discrete, (A, B, C, D) = entry
+	arrays = {'key': np.array(repr(key)), 'dt': np.array(float(discrete.dt)), 'A': A, 'B': B, 'C': C, 'D': np.array(D)}
+	if isinstance(discrete, control.TransferFunction):
+		arrays['num'] = np.ravel(discrete.num[0][0])
+		arrays['den'] = np.ravel(discrete.den[0][0])
+	try:
+		path = _entryPath(key)
+		path.parent.mkdir(parents = True, exist_ok = True)
+		# Written under a temporary name, so concurrent processes never read a partial file
+		temporary = path.with_name(f'{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp')
+		with open(temporary, 'wb') as file:
+			np.savez(file, **arrays)
+		os.replace(temporary, path)
+	except OSError:
+		pass
@@ -0,0 +1,34 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import numpy as np
+
+def disturbControlAction(control_action, last_control_action, multiplicative_noise, additive_noise, rate_saturation, negative_saturation, positive_saturation, period):
+	# Applies the experiment disturbances to the actuators (last axis: heater 1, heater 2 and fan).
+	# Every argument broadcasts, so the same stage can process a batch of runs at once.
+	control_action = np.asarray(control_action)*multiplicative_noise
+	control_action = control_action + additive_noise
+	rate_limit = rate_saturation*period/1000
+	control_action = np.clip(control_action, np.subtract(last_control_action, rate_limit), np.add(last_control_action, rate_limit))
+	control_action = np.clip(control_action, negative_saturation, positive_saturation)
+	return control_action
@@ -52,5 +52,12 @@ class CSVColumns(Enum):
     DisturbedPWMH1 = 'H1_D_PWM'
     DisturbedPWMH2 = 'H2_D_PWM'
     DisturbedPWMFan = 'F_D_PWM'
+    AppliedPWMH1 = 'H1_A_PWM'
+    AppliedPWMH2 = 'H2_A_PWM'
+    AppliedPWMFan = 'F_A_PWM'
     NewControlAction = 'CTRL_ACTION'
-    ControlActionComputationTime = 'CTRL_TIME'
\ No newline at end of file
+    ControlActionComputationTime = 'CTRL_TIME'
+    SerialCommunicationTime = 'IO_TIME'
+    DisturbanceApplicationTime = 'DIST_TIME'
+    LogTime = 'LOG_TIME'
+    SchedulerSlackTime = 'SLACK_TIME'
\ No newline at end of file
@@ -0,0 +1,100 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import numpy as np
+import pandas as pd
+from scipy import signal
+from Modules.tecolab_enums import CSVColumns
+from Modules.tecolab_metrics import trackingError
+
+COMPUTED_PWM_COLUMNS = (CSVColumns.ComputedPWMH1, CSVColumns.ComputedPWMH2, CSVColumns.ComputedPWMFan)
+
+# Offline evaluation of controllers on a recorded (or simulated) log: the setpoints and
+# temperatures of the log are fed to the controller and the control actions it would have
+# computed are scored. The plant is not simulated, so the temperatures stay the logged ones.
+
+def controlInstants(controller, length: int):
+	# Samples where control_signal() is True. Periodic controllers compute on the first sample
+	# and then every signal_period samples, other controllers on every sample.
+	instants = np.zeros(length, dtype = bool)
+	period = getattr(controller, 'signal_period', 0)
+	instants[::max(round(period), 1)] = True
+	return instants
+
+def holdSamples(values, instants):
+	# Holds each value computed at an instant until the next one, like Experiment.setControlAction()
+	return np.asarray(values)[np.maximum(np.cumsum(instants) - 1, 0)]
+
+def LTI_replay(controller, index: int, u, instants = None):
+	# Output sequence of the LTI block with the given index of a discrete_time_LTI (or
+	# continuous_time_LTI/PID) controller, starting from rest. The whole sequence is computed
+	# in one lfilter pass instead of one LTI_compute() call per sample.
+	u = np.asarray(u, dtype = np.float64)
+	if instants is None:
+		instants = controlInstants(controller, len(u))
+	A, B, C, D = controller._A[index], controller._B[index], controller._C[index], controller._D[index]
+	if A.size == 0:
+		y = D*u[instants]
+	else:
+		numerator, denominator = signal.ss2tf(A, B[:, None], C[None, :], [[D]])
+		y = signal.lfilter(numerator[0], denominator, u[instants])
+	return holdSamples(y, instants)
+
+def evaluateLTIController(controller, log, blocks: dict):
+	# Computed PWMs of a controller whose heater actions are LTI blocks fed by the tracking
+	# error, e.g. blocks = {1: controller.pid} for a PID on heater 1. Samples without a setpoint
+	# feed a zero error. Heaters without a block and the fan get 0.
+	length = len(log)
+	instants = controlInstants(controller, length)
+	pwm = np.zeros((length, len(COMPUTED_PWM_COLUMNS)))
+	for heater, index in blocks.items():
+		pwm[:, heater - 1] = LTI_replay(controller, index, np.nan_to_num(trackingError(log, heater)), instants)
+	return pd.DataFrame(pwm, columns = [column.value for column in COMPUTED_PWM_COLUMNS])
+
+def replayPerSample(controller, log):
+	# Fallback for any controller: calls _control_compute() on every sample of the log, as the
+	# experiment loop does, and returns the computed PWMs
+	setpoints = log[[CSVColumns.SetPoint1Absolute.value, CSVColumns.SetPoint2Absolute.value, CSVColumns.SetPoint1Relative.value, CSVColumns.SetPoint2Relative.value]].to_numpy(dtype = np.float64)
+	temperatures = log[[CSVColumns.TemperatureH1.value, CSVColumns.TemperatureH2.value, CSVColumns.TemperatureAMB.value]].to_numpy(dtype = np.float64)
+	pwm = np.zeros((len(log), len(COMPUTED_PWM_COLUMNS)))
+	last = [0, 0, 0]
+	for k in range(len(log)):
+		actions, _, _ = controller._control_compute(tuple(setpoints[k].tolist()), tuple(temperatures[k].tolist()))
+		for i, value in enumerate(actions):
+			if isinstance(value, (int, float)):
+				last[i] = value
+		pwm[k] = last
+	return pd.DataFrame(pwm, columns = [column.value for column in COMPUTED_PWM_COLUMNS])
+
+def scoreControlActions(log, pwm):
+	# Scores the computed PWMs of both heaters: mean, fraction of samples out of the [0, 100]
+	# range, total variation, and RMS difference to the PWMs computed in the log
+	score = dict()
+	for name, column in (('H1', CSVColumns.ComputedPWMH1), ('H2', CSVColumns.ComputedPWMH2)):
+		action = pwm[column.value].to_numpy(dtype = np.float64)
+		logged = log[column.value].to_numpy(dtype = np.float64)
+		score[f'{name}_MEAN_PWM'] = float(np.mean(action)) if action.size else np.nan
+		score[f'{name}_SATURATION'] = float(np.mean((action < 0) | (action > 100))) if action.size else np.nan
+		score[f'{name}_TOTAL_VARIATION'] = float(np.sum(np.abs(np.diff(action))))
+		score[f'{name}_PWM_RMSD'] = float(np.sqrt(np.mean((action - logged)**2))) if action.size else np.nan
+	return score
@@ -0,0 +1,111 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import numpy as np
+import pandas as pd
+from Modules.tecolab_enums import CSVColumns
+from Modules.tecolab_schedule import SCHEDULE_COLUMNS
+
+# Randomized experiment tables built from a seed and a spec. The spec gives the duration [ms],
+# the time resolution of the changes [ms] and one signal per column of the experiment table:
+#   {'type': 'constant', 'value': v}
+#   {'type': 'steps', 'min': a, 'max': b, 'hold_min': ms, 'hold_max': ms, 'decimals': 1,
+#    'probability': 1, 'default': None}: random levels held for random times. With a probability
+#    below 1, the other segments take the default value (None leaves the cells empty).
+#   {'type': 'prbs', 'low': a, 'high': b, 'bit': ms, 'order': 7}: maximum length sequence
+# Columns left out of the spec stay empty, i.e. setpoints undefined and disturbances at their defaults.
+DEFAULT_SPEC = {
+	'duration': 3600000,
+	'resolution': 1000,
+	'columns': {
+		'SP1_ABS': {'type': 'steps', 'min': 30, 'max': 70, 'hold_min': 120000, 'hold_max': 600000},
+		'SP2_ABS': {'type': 'steps', 'min': 30, 'max': 70, 'hold_min': 120000, 'hold_max': 600000},
+		'H1_MUL_NOISE': {'type': 'steps', 'min': 0.8, 'max': 1.2, 'hold_min': 60000, 'hold_max': 300000, 'decimals': 2, 'probability': 0.3, 'default': 1},
+		'H2_MUL_NOISE': {'type': 'steps', 'min': 0.8, 'max': 1.2, 'hold_min': 60000, 'hold_max': 300000, 'decimals': 2, 'probability': 0.3, 'default': 1},
+		'F_ADD_NOISE': {'type': 'steps', 'min': 20, 'max': 100, 'hold_min': 60000, 'hold_max': 300000, 'decimals': 0, 'probability': 0.3, 'default': 0},
+		'H1_POS_SAT': {'type': 'steps', 'min': 40, 'max': 90, 'hold_min': 60000, 'hold_max': 300000, 'decimals': 0, 'probability': 0.2, 'default': 100},
+		'H2_POS_SAT': {'type': 'steps', 'min': 40, 'max': 90, 'hold_min': 60000, 'hold_max': 300000, 'decimals': 0, 'probability': 0.2, 'default': 100},
+	},
+}
+
+def generateExperiment(spec: dict = DEFAULT_SPEC, seed: int = 0):
+	# Returns the experiment table, with one row per change of any column and a final row at
+	# the duration that turns everything off, like the hand-written experiments
+	duration = int(spec['duration'])
+	resolution = max(int(spec.get('resolution', 1000)), 1)
+	names = [column.value for column in SCHEDULE_COLUMNS[1:]]
+	signals = dict()
+	for name, signal in spec.get('columns', dict()).items():
+		if name not in names:
+			raise ValueError(f'Unknown experiment table column: {name}')
+		# One generator per column, so adding a column to the spec never changes the others
+		rng = np.random.default_rng([seed, names.index(name)])
+		signals[name] = _changes(*_generateSignal(signal, duration, resolution, rng))
+
+	time = np.unique(np.concatenate([np.zeros(1, dtype = np.int64)] + [changes[0] for changes in signals.values()]))
+	table = pd.DataFrame({CSVColumns.Time.value: np.append(time, duration)})
+	for name in names:
+		values = np.full(len(time), np.nan)
+		if name in signals:
+			times, levels = signals[name]
+			values = levels[np.searchsorted(times, time, side = 'right') - 1]
+		table[name] = np.append(values, 0)
+	return table
+
+def writeExperiment(table, path: str):
+	table.to_csv(path, index = False)
+
+def _generateSignal(signal, duration, resolution, rng):
+	# Returns the change times [ms], multiples of the resolution, and the levels of one signal
+	kind = signal.get('type', 'steps')
+	if kind == 'constant':
+		return np.zeros(1, dtype = np.int64), np.array([signal['value']], dtype = np.float64)
+	if kind == 'steps':
+		hold_min = max(int(signal['hold_min'])//resolution, 1)
+		hold_max = max(int(signal.get('hold_max', signal['hold_min']))//resolution, hold_min)
+		count = duration//(hold_min*resolution) + 1
+		holds = rng.integers(hold_min, hold_max + 1, count)*resolution
+		times = np.concatenate(([0], np.cumsum(holds)[:-1]))
+		times = times[times < duration]
+		levels = np.round(rng.uniform(signal['min'], signal['max'], len(times)), signal.get('decimals', 1))
+		probability = signal.get('probability', 1)
+		if probability < 1:
+			default = signal.get('default')
+			levels = np.where(rng.random(len(times)) < probability, levels, np.nan if default is None else default)
+		return times, levels
+	if kind == 'prbs':
+		from scipy.signal import max_len_seq
+		order = int(signal.get('order', 7))
+		bit = max(int(signal['bit'])//resolution, 1)*resolution
+		state = rng.integers(0, 2, order)
+		state[rng.integers(order)] = 1 # The register must not start at zero
+		bits = max_len_seq(order, state = state, length = -(-duration//bit))[0]
+		times = np.arange(len(bits), dtype = np.int64)*bit
+		return times, np.where(bits == 1, signal['high'], signal['low']).astype(np.float64)
+	raise ValueError(f'Unknown signal type: {kind}')
+
+def _changes(times, levels):
+	# Keeps only the times where the level changes (empty cells compare equal)
+	same = (levels[1:] == levels[:-1]) | (np.isnan(levels[1:]) & np.isnan(levels[:-1]))
+	keep = np.concatenate(([True], ~same))
+	return times[keep].astype(np.int64), levels[keep]
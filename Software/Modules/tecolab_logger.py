@@ -0,0 +1,207 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import pathlib
+import queue
+import threading
+from Modules.tecolab_enums import CSVColumns
+
+# numpy and pandas are imported when they are first needed, so the command line parsing that
+# reads LOG_FORMATS stays light
+
+LOG_INTEGER_COLUMNS = (CSVColumns.Time, CSVColumns.NewControlAction)
+LOG_QUEUE_SIZE = 4 # Number of buffers that can wait to be written
+LOG_ROW_GROUP_SIZE = 65536 # Rows per Feather record batch or Parquet row group
+LOG_PARTIAL_SUFFIX = '.partial' # Arrow stream of a Feather or Parquet log until the experiment ends
+LOG_FORMATS = {'csv': '.csv', 'feather': '.arrow', 'parquet': '.parquet'} # Log format and file extension
+
+def logFormat(filename: str):
+	# Log format of a file, from its extension (CSV when unknown)
+	suffix = pathlib.Path(filename).suffix.lower()
+	for log_format, extension in LOG_FORMATS.items():
+		if suffix == extension or suffix == '.' + log_format:
+			return log_format
+	return 'csv'
+
+def readLog(filename: str, columns = None):
+	# Loads a log file of any format. Feather and Parquet logs only read the requested columns.
+	import pandas as pd
+	log_format = logFormat(filename)
+	if log_format != 'csv' and not pathlib.Path(filename).is_file() and pathlib.Path(filename + LOG_PARTIAL_SUFFIX).is_file():
+		return _readPartialLog(filename + LOG_PARTIAL_SUFFIX, columns) # Run that never reached close()
+	if log_format == 'feather':
+		return pd.read_feather(filename, columns = columns)
+	if log_format == 'parquet':
+		return pd.read_parquet(filename, columns = columns)
+	return pd.read_csv(filename, usecols = columns)
+
+def exportLog(filename: str, export_filename: str):
+	# Converts a log file to another format, e.g. a Feather or Parquet log to CSV
+	log = readLog(filename)
+	log_format = logFormat(export_filename)
+	if log_format == 'feather':
+		log.to_feather(export_filename)
+	elif log_format == 'parquet':
+		log.to_parquet(export_filename, index = False)
+	else:
+		log.to_csv(export_filename, index = False)
+
+def _readPartialLog(filename: str, columns = None):
+	# Arrow stream of a run that was killed: every batch written before the crash is read,
+	# a batch cut short by the crash ends the log
+	import pandas as pd
+	import pyarrow as pa
+	batches = list()
+	schema = None
+	with pa.OSFile(filename) as source:
+		try:
+			reader = pa.ipc.open_stream(source)
+			schema = reader.schema if columns is None else pa.schema([reader.schema.field(name) for name in columns])
+			for batch in reader:
+				batches.append(batch if columns is None else batch.select(list(columns)))
+		except (pa.ArrowInvalid, OSError):
+			pass
+	if schema is None:
+		return pd.DataFrame(columns = columns if columns is not None else [column.value for column in CSVColumns])
+	return pa.Table.from_batches(batches, schema = schema).to_pandas()
+
+class Logger:
+	def __init__(self, filename: str, capacity: int = 1024, log_format: str = None):
+		# One preallocated record per sample, with one field per column of the log file
+		import numpy as np
+		self.filename = filename
+		self.log_format = log_format if log_format is not None else logFormat(filename)
+		self.capacity = max(int(capacity), 1)
+		self.dtype = np.dtype([(column.value, np.int64 if column in LOG_INTEGER_COLUMNS else np.float64) for column in CSVColumns])
+		self.buffer = np.zeros(self.capacity, dtype = self.dtype)
+		self.size = 0
+		self._write_header = not pathlib.Path(self.filename).is_file()
+		self._error = None
+		self._table_writer = None # Feather and Parquet writer, opened by the writer thread
+
+		# Filled buffers are written by a background thread and then recycled
+		self._pending = queue.Queue(maxsize = LOG_QUEUE_SIZE)
+		self._free = queue.Queue()
+		for _ in range(LOG_QUEUE_SIZE):
+			self._free.put(np.zeros(self.capacity, dtype = self.dtype))
+		self._writer = threading.Thread(target = self._writerLoop, name = 'TeCoLabLogWriter', daemon = True)
+		self._writer.start()
+
+	def append(self, row: tuple):
+		# The row values must follow the order of CSVColumns
+		if self.size >= self.capacity:
+			self.flush()
+		self.buffer[self.size] = row
+		self.size = self.size + 1
+
+	def flush(self):
+		# Hands the current buffer to the writer thread without touching the disk
+		if self.size == 0:
+			return
+		self._pending.put((self.buffer, self.size))
+		self.buffer = self._free.get()
+		self.size = 0
+
+	def close(self):
+		# Writes everything still buffered and waits for the writer thread to finish
+		if self._writer.is_alive():
+			self.flush()
+			self._pending.put(None)
+			self._writer.join()
+		if self._error is not None:
+			raise self._error
+
+	def _writerLoop(self):
+		while True:
+			item = self._pending.get()
+			if item is None:
+				try:
+					self._closeTableWriter()
+				except Exception as error:
+					self._error = self._error or error
+				return
+			buffer, size = item
+			try:
+				if self._error is None:
+					self._write(buffer[:size])
+			except Exception as error:
+				self._error = error
+			self._free.put(buffer)
+
+	def _write(self, records):
+		if self.log_format == 'csv':
+			import pandas as pd
+			pd.DataFrame(records).to_csv(self.filename, mode = 'w' if self._write_header else 'a', index = False, header = self._write_header)
+			self._write_header = False
+			return
+		# Every flush is one record batch of an Arrow stream, which is readable up to the last
+		# complete batch even when the program is killed
+		import pyarrow as pa
+		self._openTableWriter()
+		self._table_writer.write_batch(pa.RecordBatch.from_arrays([pa.array(records[name]) for name in self.dtype.names], schema = self._schema))
+
+	def _openTableWriter(self):
+		# pyarrow is only imported by the writer thread of Feather and Parquet logs. Both formats
+		# are only readable once their footer is written, so the samples are streamed to a
+		# partial Arrow file and converted when the experiment ends.
+		if self._table_writer is None:
+			import pyarrow as pa
+			if self.log_format not in ('feather', 'parquet'):
+				raise ValueError(f'Unknown log format: {self.log_format}')
+			self._schema = pa.schema([(name, pa.from_numpy_dtype(self.dtype[name])) for name in self.dtype.names])
+			self._table_writer = pa.ipc.new_stream(self.filename + LOG_PARTIAL_SUFFIX, self._schema)
+		return self._table_writer
+
+	def _closeTableWriter(self):
+		# Also creates the file, with no rows, when nothing was logged
+		if self.log_format != 'csv':
+			self._openTableWriter()
+			self._table_writer.close()
+			self._convertPartialLog(self.filename + LOG_PARTIAL_SUFFIX)
+
+	def _convertPartialLog(self, partial_filename):
+		# Feather record batches and Parquet row groups of LOG_ROW_GROUP_SIZE rows, since the
+		# small batches of each flush make the files larger and much slower to read than the CSV
+		import pyarrow as pa
+		if self.log_format == 'feather':
+			writer = pa.ipc.new_file(self.filename, self._schema, options = pa.ipc.IpcWriteOptions(compression = 'lz4'))
+			write = lambda table: writer.write_table(table, max_chunksize = LOG_ROW_GROUP_SIZE)
+		else:
+			import pyarrow.parquet as pq
+			writer = pq.ParquetWriter(self.filename, self._schema)
+			write = lambda table: writer.write_table(table, row_group_size = LOG_ROW_GROUP_SIZE)
+		with pa.OSFile(partial_filename) as source, writer:
+			batches = list()
+			rows = 0
+			for batch in pa.ipc.open_stream(source):
+				batches.append(batch)
+				rows = rows + batch.num_rows
+				if rows >= LOG_ROW_GROUP_SIZE:
+					table = pa.Table.from_batches(batches).combine_chunks()
+					full = rows - rows % LOG_ROW_GROUP_SIZE
+					write(table.slice(0, full))
+					batches = table.slice(full).to_batches()
+					rows = rows - full
+			if batches:
+				write(pa.Table.from_batches(batches).combine_chunks())
+		pathlib.Path(partial_filename).unlink()
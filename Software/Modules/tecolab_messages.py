@@ -31,9 +31,17 @@ class TecolabMessages(Enum):
     ErrorMessage6 = 'ERROR: Experiment table has nonpositive values of rate saturation for heater 1.'
     ErrorMessage7 = 'ERROR: Experiment table has nonpositive values of rate saturation for heater 2.'
     ErrorMessage8 = 'ERROR: Experiment table has nonpositive values of rate saturation for fan.'
+    ErrorMessage9 = 'ERROR: No valid answer from the TeCoLab device. Terminating program.'
+    ErrorMessage10 = 'ERROR: Controller module not found:'
+    ErrorMessage11 = 'ERROR: Experiment table has missing values in time column.'
+    ErrorMessage12 = 'ERROR: No valid answer from the TeCoLab device at port:'
+    ErrorMessage13 = 'ERROR: Telemetry address is an existing file that is not a socket:'
 
     WarningMessage1 = 'WARNING: Experiment table has negative values of relative setpoint 1.'
     WarningMessage2 = 'WARNING: Experiment table has negative values of relative setpoint 2.'
+    WarningMessage3 = 'WARNING: TeCoLab device reported an error (0xF0 means overheating):'
+    WarningMessage4 = 'WARNING: The replay diverged from the capture, its temperatures do not answer these control actions.'
+    WarningMessage5 = 'WARNING: UNIX sockets are not available, using telemetry on TCP port'
 
     Message1 = 'No TeCoLab device found. Terminating program.'
     Message2 = 'Loading experiment: '
@@ -42,4 +50,15 @@ class TecolabMessages(Enum):
     Message5 = 'No serial devices connected. Terminating program.'
     Message6 = 'Searching for TeCoLab device:'
     Message7 = 'Testing port: '
-    Message8 = 'TeCoLab device found at port: '
\ No newline at end of file
+    Message8 = 'TeCoLab device found at port: '
+    Message9 = 'Using a simulated TeCoLab device.'
+    Message10 = 'Missed deadlines:'
+    Message11 = 'of'
+    Message12 = 'Statistics per TeCoLab device:'
+    Message13 = 'Serial link statistics:'
+    Message14 = 'Replaying capture file: '
+    Message15 = 'Publishing telemetry on: '
+    Message16 = 'Loop timing:'
+    Message17 = 'rows, starting with:'
+    Message18 = 'Telemetry samples dropped:'
+    Message19 = 'Replayed requests that differ from the capture:'
\ No newline at end of file
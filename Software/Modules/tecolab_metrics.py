@@ -0,0 +1,60 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import numpy as np
+from Modules.tecolab_enums import CSVColumns
+
+def trackingMetrics(log):
+	# Tracking metrics of both heaters from a log table. The absolute setpoint is used when
+	# it is defined, otherwise the relative setpoint is added to the ambient temperature.
+	time = log[CSVColumns.Time.value].to_numpy(dtype = np.float64)/1000 # [s]
+	dt = np.diff(time, append = time[-1]) if len(time) else time
+	ambient = log[CSVColumns.TemperatureAMB.value].to_numpy(dtype = np.float64)
+	heaters = (
+		('H1', CSVColumns.TemperatureH1, CSVColumns.SetPoint1Absolute, CSVColumns.SetPoint1Relative, CSVColumns.DisturbedPWMH1),
+		('H2', CSVColumns.TemperatureH2, CSVColumns.SetPoint2Absolute, CSVColumns.SetPoint2Relative, CSVColumns.DisturbedPWMH2),
+	)
+	metrics = dict()
+	for name, temperature, absolute, relative, pwm in heaters:
+		error = _trackingError(log, ambient, temperature, absolute, relative)
+		tracked = ~np.isnan(error)
+		e, w = error[tracked], dt[tracked]
+		metrics[f'{name}_IAE'] = float(np.sum(np.abs(e)*w)) if e.size else np.nan
+		metrics[f'{name}_ISE'] = float(np.sum(e**2*w)) if e.size else np.nan
+		metrics[f'{name}_RMSE'] = float(np.sqrt(np.mean(e**2))) if e.size else np.nan
+		metrics[f'{name}_MAX_ERROR'] = float(np.max(np.abs(e))) if e.size else np.nan
+		metrics[f'{name}_MEAN_PWM'] = float(np.mean(log[pwm.value].to_numpy(dtype = np.float64))) if len(time) else np.nan
+	return metrics
+
+def trackingError(log, heater: int):
+	# Setpoint minus temperature of heater 1 or 2, NaN where no setpoint is defined
+	temperature, absolute, relative = {
+		1: (CSVColumns.TemperatureH1, CSVColumns.SetPoint1Absolute, CSVColumns.SetPoint1Relative),
+		2: (CSVColumns.TemperatureH2, CSVColumns.SetPoint2Absolute, CSVColumns.SetPoint2Relative),
+	}[heater]
+	return _trackingError(log, log[CSVColumns.TemperatureAMB.value].to_numpy(dtype = np.float64), temperature, absolute, relative)
+
+def _trackingError(log, ambient, temperature, absolute, relative):
+	setpoint = log[absolute.value].to_numpy(dtype = np.float64)
+	setpoint = np.where(np.isnan(setpoint), ambient + log[relative.value].to_numpy(dtype = np.float64), setpoint)
+	return setpoint - log[temperature.value].to_numpy(dtype = np.float64)
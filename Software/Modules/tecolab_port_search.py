@@ -0,0 +1,142 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import serial
+import serial.tools.list_ports
+import time
+import json
+import pathlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from Modules.tecolab_messages import TecolabMessages
+
+# Only needs pyserial, so tecolab.py can look for the board before the heavy modules are imported
+PORT_CACHE_PATH = pathlib.Path.home()/'.tecolab_ports.json' # Last port where each TeCoLab device was found
+PROBE_TIMEOUT = 6.0 # [s] Maximum time for a board to answer after the port is opened
+PROBE_SETTLE_TIME = 0.2 # [s]
+
+def searchTeCoLabPort():
+	ports = _listPorts()
+	if not ports:
+		return False
+	## Search for TeCoLab device, starting with the ports where one was found before
+	print(TecolabMessages.Message6.value)
+	cache = _loadPortCache()
+	cached = [info for info in ports if _portKey(info) in cache]
+	others = [info for info in ports if _portKey(info) not in cache]
+	for candidates in (cached, others):
+		devices = _probePorts(candidates, find_all = False)
+		if devices:
+			_updatePortCache(cache, devices)
+			return devices[0][0]
+	return False
+
+def searchTeCoLabPorts():
+	# Returns every TeCoLab device connected, ordered by port name
+	ports = _listPorts()
+	if not ports:
+		return []
+	print(TecolabMessages.Message6.value)
+	devices = sorted(_probePorts(ports, find_all = True), key = lambda device: device[1].device)
+	_updatePortCache(_loadPortCache(), devices)
+	return [ser for ser, info in devices]
+
+def _listPorts():
+	## Check connected serial ports
+	ports = sorted(serial.tools.list_ports.comports())
+	if ports:
+		print(TecolabMessages.Message4.value)
+		for port, desc, hwid in ports:
+		   	print("{}: {} [{}]".format(port, desc, hwid))
+	else:
+		print(TecolabMessages.Message5.value)
+	return ports
+
+def _probePorts(ports, find_all: bool):
+	# Probes the ports concurrently and returns the (serial, port info) pairs that answer as a
+	# TeCoLab. Unless find_all is set, the remaining probes stop at the first device found.
+	devices = list()
+	if not ports:
+		return devices
+	found = threading.Event()
+	with ThreadPoolExecutor(max_workers = len(ports)) as executor:
+		futures = {executor.submit(_probePort, info.device, found): info for info in ports}
+		for future in as_completed(futures):
+			ser = future.result()
+			if ser == False:
+				continue
+			if find_all or not devices:
+				print(TecolabMessages.Message8.value, '{}'.format(ser.name))
+				devices.append((ser, futures[future]))
+				if not find_all:
+					found.set()
+			else:
+				ser.close()
+	return devices
+
+def _probePort(port, found):
+	# Opening the port resets the Arduino, so the ping is repeated until the firmware answers
+	# or PROBE_TIMEOUT expires, instead of sleeping for a fixed reset time.
+	try:
+		ser = serial.Serial(port, 115200, timeout = 0.10, write_timeout = 1.00)
+	except Exception:
+		return False
+	print(TecolabMessages.Message7.value, '{}'.format(ser.name))
+	deadline = time.monotonic() + PROBE_TIMEOUT
+	answer = b""
+	try:
+		while time.monotonic() < deadline and not found.is_set():
+			ser.write(b"AA")
+			answer = answer[-1:] + ser.read(2)
+			if b"AA" in answer:
+				# Lets late answers to previous pings arrive and discards them
+				time.sleep(PROBE_SETTLE_TIME)
+				ser.reset_input_buffer()
+				return ser
+	except Exception:
+		pass
+	ser.close()
+	return False
+
+def _portKey(info):
+	return info.serial_number or info.hwid
+
+def _loadPortCache():
+	try:
+		with open(PORT_CACHE_PATH) as file:
+			cache = json.load(file)
+		return cache if isinstance(cache, dict) else dict()
+	except (OSError, ValueError):
+		return dict()
+
+def _updatePortCache(cache, devices):
+	for ser, info in devices:
+		cache[_portKey(info)] = info.device
+	_savePortCache(cache)
+
+def _savePortCache(cache):
+	try:
+		with open(PORT_CACHE_PATH, 'w') as file:
+			json.dump(cache, file, indent = 1)
+	except OSError:
+		pass
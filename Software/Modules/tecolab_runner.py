@@ -0,0 +1,100 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import time
+from Modules.tecolab_communication_protocol import controlCycle, writePWMs
+
+def runExperiment(tecolab, experiment, controller):
+	try:
+		timing = experiment.timing
+		while(experiment.is_running == True):
+			t_0 = time.perf_counter_ns()
+			if (experiment.iterationControl() == True):
+				t_1 = time.perf_counter_ns()
+				timing.record('SLACK', t_1 - t_0)
+
+				# Applies the last control action to the board and reads temperatures. The action was
+				# computed in the previous period, so it is logged again as applied in this row.
+				controlAction = experiment.getDisturbedControlAction()
+				experiment.setTemperatures(controlCycle(tecolab, controlAction))
+				experiment.setAppliedControlAction(controlAction)
+				t_2 = time.perf_counter_ns()
+				timing.record('IO', t_2 - t_1)
+
+				# Get control action
+				experiment.setControlAction(controller._control_compute(experiment.getSetPoints(), experiment.getTemperatures()))
+				timing.record('CTRL', experiment.time_control_action_computation*1e6)
+
+				# Adds experiment disturbances
+				t_3 = time.perf_counter_ns()
+				experiment.applyDisturbances()
+				t_4 = time.perf_counter_ns()
+				timing.record('DIST', t_4 - t_3)
+
+				# Logs the information
+				experiment.log()
+				timing.record('LOG', time.perf_counter_ns() - t_4)
+				timing.endIteration()
+	finally:
+		try:
+			writePWMs(tecolab, (0, 0, 0)) # Turn the board off after the experiment
+		finally:
+			experiment.close() # Writes the remaining log samples
+
+async def runExperimentAsync(tecolab, experiment, controller):
+	# Same loop as runExperiment() for an AsyncTeCoLab device, so several boards can share one event loop
+	try:
+		timing = experiment.timing
+		while(experiment.is_running == True):
+			t_0 = time.perf_counter_ns()
+			if (await experiment.iterationControlAsync() == True):
+				t_1 = time.perf_counter_ns()
+				timing.record('SLACK', t_1 - t_0)
+
+				# Applies the last control action to the board and reads temperatures. The action was
+				# computed in the previous period, so it is logged again as applied in this row.
+				controlAction = experiment.getDisturbedControlAction()
+				experiment.setTemperatures(await tecolab.controlCycle(controlAction))
+				experiment.setAppliedControlAction(controlAction)
+				t_2 = time.perf_counter_ns()
+				timing.record('IO', t_2 - t_1)
+
+				# Get control action
+				experiment.setControlAction(controller._control_compute(experiment.getSetPoints(), experiment.getTemperatures()))
+				timing.record('CTRL', experiment.time_control_action_computation*1e6)
+
+				# Adds experiment disturbances
+				t_3 = time.perf_counter_ns()
+				experiment.applyDisturbances()
+				t_4 = time.perf_counter_ns()
+				timing.record('DIST', t_4 - t_3)
+
+				# Logs the information
+				experiment.log()
+				timing.record('LOG', time.perf_counter_ns() - t_4)
+				timing.endIteration()
+	finally:
+		try:
+			await tecolab.writePWMs((0, 0, 0)) # Turn the board off after the experiment
+		finally:
+			experiment.close() # Writes the remaining log samples
@@ -0,0 +1,140 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import pathlib
+import numpy as np
+from Modules.tecolab_enums import CSVColumns
+
+SCHEDULE_COLUMNS = (
+	CSVColumns.Time,
+	CSVColumns.SetPoint1Absolute,
+	CSVColumns.SetPoint2Absolute,
+	CSVColumns.SetPoint1Relative,
+	CSVColumns.SetPoint2Relative,
+	CSVColumns.MultiplicativeNoiseH1,
+	CSVColumns.MultiplicativeNoiseH2,
+	CSVColumns.MultiplicativeNoiseFan,
+	CSVColumns.AdditiveNoiseH1,
+	CSVColumns.AdditiveNoiseH2,
+	CSVColumns.AdditiveNoiseFan,
+	CSVColumns.NegativeSaturationH1,
+	CSVColumns.NegativeSaturationH2,
+	CSVColumns.NegativeSaturationFan,
+	CSVColumns.PositiveSaturationH1,
+	CSVColumns.PositiveSaturationH2,
+	CSVColumns.PositiveSaturationFan,
+	CSVColumns.RateSaturationH1,
+	CSVColumns.RateSaturationH2,
+	CSVColumns.RateSaturationFan,
+)
+
+# Values used when a cell of the experiment table is empty (setpoints stay empty)
+SCHEDULE_DEFAULTS = {
+	CSVColumns.MultiplicativeNoiseH1: 1,
+	CSVColumns.MultiplicativeNoiseH2: 1,
+	CSVColumns.MultiplicativeNoiseFan: 1,
+	CSVColumns.AdditiveNoiseH1: 0,
+	CSVColumns.AdditiveNoiseH2: 0,
+	CSVColumns.AdditiveNoiseFan: 0,
+	CSVColumns.NegativeSaturationH1: 0,
+	CSVColumns.NegativeSaturationH2: 0,
+	CSVColumns.NegativeSaturationFan: 0,
+	CSVColumns.PositiveSaturationH1: 100,
+	CSVColumns.PositiveSaturationH2: 100,
+	CSVColumns.PositiveSaturationFan: 100,
+	CSVColumns.RateSaturationH1: 1000,
+	CSVColumns.RateSaturationH2: 1000,
+	CSVColumns.RateSaturationFan: 1000,
+}
+
+SCHEDULE_DTYPE = np.dtype([(column.value, np.float64) for column in SCHEDULE_COLUMNS])
+
+SCHEDULE_EXTENSION = '.npy' # Compiled schedule, see tecolab_compile.py
+
+def compileSchedule(table):
+	# Compiles the experiment table into one record per row with the defaults already applied
+	rows = np.zeros(len(table), dtype = SCHEDULE_DTYPE)
+	for column in SCHEDULE_COLUMNS:
+		if column.value in table:
+			values = table[column.value].to_numpy(dtype = np.float64)
+		else:
+			values = np.full(len(table), np.nan)
+		if column in SCHEDULE_DEFAULTS:
+			values = np.where(np.isnan(values), SCHEDULE_DEFAULTS[column], values)
+		rows[column.value] = values
+	return rows
+
+def saveSchedule(rows, path: str):
+	np.save(path, rows, allow_pickle = False)
+
+def loadSchedule(path: str):
+	# Memory-maps a compiled schedule, so even very long experiments load instantly
+	rows = np.load(path, mmap_mode = 'r', allow_pickle = False)
+	if rows.dtype != SCHEDULE_DTYPE:
+		raise ValueError(f'{path} is not a compiled TeCoLab schedule')
+	return rows
+
+def experimentPath(name: str):
+	# Path of an experiment of the Experiments folder: its compiled schedule when it is not
+	# older than the CSV table, otherwise the table itself
+	table = pathlib.Path('Experiments')/(name + '.csv')
+	compiled = table.with_suffix(SCHEDULE_EXTENSION)
+	if compiled.is_file() and (not table.is_file() or compiled.stat().st_mtime >= table.stat().st_mtime):
+		return str(compiled)
+	return str(table)
+
+class Schedule:
+	def __init__(self, table):
+		# The table is an experiment table or an already compiled schedule (e.g. from loadSchedule())
+		if isinstance(table, np.ndarray) and table.dtype == SCHEDULE_DTYPE:
+			self.rows = table
+		else:
+			self.rows = compileSchedule(table)
+		self.time = np.ascontiguousarray(self.rows[CSVColumns.Time.value])
+
+		# Disturbance parameters per row as (heater 1, heater 2, fan). They are views of the
+		# records, whose fields are all float64, so a memory-mapped schedule is never copied.
+		matrix = self.rows.view(np.float64).reshape(len(self.rows), len(SCHEDULE_COLUMNS))
+		self.multiplicative_noise = self._pack(matrix, CSVColumns.MultiplicativeNoiseH1)
+		self.additive_noise = self._pack(matrix, CSVColumns.AdditiveNoiseH1)
+		self.negative_saturation = self._pack(matrix, CSVColumns.NegativeSaturationH1)
+		self.positive_saturation = self._pack(matrix, CSVColumns.PositiveSaturationH1)
+		self.rate_saturation = self._pack(matrix, CSVColumns.RateSaturationH1)
+		self.cursor = 0
+
+	def __len__(self):
+		return len(self.rows)
+
+	def seek(self, time):
+		# Returns the last row whose time is not greater than the given time.
+		# The cursor only moves when a new row is reached, so each call is O(1) in the usual case.
+		cursor = self.cursor
+		if (cursor + 1 < len(self.time) and self.time[cursor + 1] <= time) or (self.time[cursor] > time):
+			cursor = max(int(np.searchsorted(self.time, time, side = 'right')) - 1, 0)
+			self.cursor = cursor
+		return self.rows[cursor]
+
+	def _pack(self, matrix, first_column):
+		# The heater 1, heater 2 and fan columns of each parameter are consecutive in SCHEDULE_COLUMNS
+		first = SCHEDULE_COLUMNS.index(first_column)
+		return matrix[:, first:first + 3]
@@ -0,0 +1,67 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+class Scheduler:
+	def __init__(self, period: int, clock):
+		# Periodic ticks at absolute deadlines, so the waiting time of one iteration never
+		# shifts the following ones
+		self.clock = clock
+		self.period = max(int(period), 1)*1000000 # [ns]
+		self.time_start = None # Set by the first call of wait()
+		self.deadline = None
+		self.ticks = 0
+		self.missed_deadlines = 0
+		self.max_lateness = 0 # [ns]
+
+	def wait(self):
+		# Waits for the next deadline and returns the time of the tick [ns]. When the previous
+		# iteration overran, the tick runs immediately and any whole periods already lost are skipped.
+		if self._isLate(self.clock.monotonic_ns()) == False:
+			self.clock.wait_until(self.deadline)
+		return self._tick()
+
+	async def wait_async(self):
+		# Same as wait(), but lets other tasks of the event loop run until the deadline
+		if self._isLate(self.clock.monotonic_ns()) == False:
+			await self.clock.wait_until_async(self.deadline)
+		return self._tick()
+
+	def _isLate(self, now: int):
+		if self.time_start is None:
+			self.time_start = now
+			self.deadline = now + self.period
+		if now <= self.deadline:
+			return False
+		lost_periods = (now - self.deadline)//self.period
+		self.missed_deadlines = self.missed_deadlines + 1 + lost_periods
+		self.max_lateness = max(self.max_lateness, now - self.deadline)
+		self.deadline = self.deadline + lost_periods*self.period
+		return True
+
+	def _tick(self):
+		self.deadline = self.deadline + self.period
+		self.ticks = self.ticks + 1
+		return self.clock.monotonic_ns()
+
+	def elapsed(self, tick: int):
+		return (tick - self.time_start)//1000000 # [ms]
@@ -0,0 +1,204 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+from collections import deque
+
+# Firmware memory map (see Firmware/tecolab.h)
+ROOMTEMP_ADDR = 0x00
+HEATER1TEMP_ADDR = 0x02
+HEATER2TEMP_ADDR = 0x04
+HEATER1PWM_ADDR = 0x06
+HEATER2PWM_ADDR = 0x07
+COOLERPWM_ADDR = 0x08
+MEMORY_SIZE = 0x10
+
+# Firmware constants (see Firmware/tecolab.h and Firmware/communication.h)
+UNKNOWNCOMMAND = 0x01
+ERROROVERHEATED = 0xF0
+OVERHEATTEMPERATURE = 100 # [°C]
+CONNECTION_TIME = 2000 # [ms]
+MAXQTYBYTES = 16
+
+INTEGRATION_STEP = 100 # [ms]
+
+class SimulatedTeCoLab:
+	# Byte-level replacement for the serial.Serial object of a TeCoLab board. Each heater
+	# follows a first-order-plus-dead-time model towards the ambient temperature, the fan
+	# increases the heat losses and both heaters are coupled through the board.
+	def __init__(self, clock, ambient_temperature: float = 25.0, static_gain: float = 0.6, time_constant: float = 200.0, time_delay: float = 15.0, fan_gain: float = 1.0, coupling: float = 0.1, resolution: float = 0.5):
+		self.name = 'TeCoLab simulator'
+		self.clock = clock
+		self.ambient_temperature = ambient_temperature
+		self.static_gain = static_gain # [°C/%]
+		self.time_constant = time_constant # [s]
+		self.time_delay = time_delay # [s]
+		self.fan_gain = fan_gain # Relative increase of the heat losses with the fan at 100%
+		self.coupling = coupling # Relative heat exchange between the heaters
+		self.resolution = resolution # Temperature sensor resolution [°C]
+
+		self.memory = bytearray(MEMORY_SIZE)
+		self.heater_temperatures = [ambient_temperature, ambient_temperature]
+		self.overheated = False
+		self._received = bytearray()
+		self._answer = bytearray()
+		self._time = clock.millis()
+		self._last_communication_time = None
+		self._inputs = deque([(self._time, 0.0, 0.0, 0.0)]) # (time, heater 1, heater 2, fan) in %
+		self._storeTemperatures()
+
+	@property
+	def in_waiting(self):
+		return len(self._answer)
+
+	def write(self, data):
+		self._update()
+		self._received.extend(data)
+		while self._received and self._handleMessage():
+			pass
+		return len(data)
+
+	def read(self, size: int = 1):
+		self._update()
+		answer = bytes(self._answer[:size])
+		del self._answer[:size]
+		return answer
+
+	def reset_input_buffer(self):
+		self._answer.clear()
+
+	def close(self):
+		pass
+
+	def _handleMessage(self):
+		# Consumes one complete message, mirroring HandleMsg() in Firmware/communication.cpp
+		message = self._received
+		command = chr(message[0])
+		if command == 'R':
+			length = 4
+		elif command == 'W':
+			if len(message) < 3:
+				return False
+			length = 4 + min(message[2], MAXQTYBYTES)
+		elif command == 'C':
+			length = 5
+		elif command == 'A':
+			length = 2
+		else:
+			length = 1
+		if len(message) < length:
+			return False
+		message = bytes(message[:length])
+		del self._received[:length]
+
+		error = ERROROVERHEATED if self.overheated else 0x00
+		if command == 'R' and self._isChecksumCorrect(message):
+			address, quantity = message[1], min(message[2], MAXQTYBYTES)
+			answer = bytes([error]) + bytes(self._getValue(address + i) for i in range(quantity))
+			self._answer.extend(answer + bytes([self._checksum(answer)]))
+		elif command == 'W' and self._isChecksumCorrect(message):
+			address = message[1]
+			for i, value in enumerate(message[3:-1]):
+				self._setValue(address + i, value)
+			self._answer.extend(bytes([error, error]))
+		elif command == 'C' and self._isChecksumCorrect(message):
+			self._setValue(HEATER1PWM_ADDR, message[1])
+			self._setValue(HEATER2PWM_ADDR, message[2])
+			self._setValue(COOLERPWM_ADDR, message[3])
+			answer = bytes([error]) + bytes(self.memory[ROOMTEMP_ADDR:HEATER2TEMP_ADDR + 2])
+			self._answer.extend(answer + bytes([self._checksum(answer)]))
+		elif command == 'A' and self._isChecksumCorrect(message):
+			self._answer.extend(b'AA')
+		elif command not in 'RWCA':
+			error = error | UNKNOWNCOMMAND
+			self._answer.extend(bytes([error, error]))
+		else:
+			return True
+		self._last_communication_time = self._time
+		self._applyInputs()
+		return True
+
+	def _getValue(self, address):
+		if address >= MEMORY_SIZE:
+			return 0
+		return self.memory[address]
+
+	def _setValue(self, address, value):
+		if address < MEMORY_SIZE:
+			self.memory[address] = value
+
+	def _checksum(self, message):
+		return sum(message) & 0xFF
+
+	def _isChecksumCorrect(self, message):
+		return self._checksum(message[:-1]) == message[-1]
+
+	def _applyInputs(self):
+		# Same actuator rules as HardwareControl() in Firmware/tecolab.cpp
+		if self.overheated:
+			inputs = (0.0, 0.0, 100.0)
+		elif self._last_communication_time is None or self._time - self._last_communication_time > CONNECTION_TIME:
+			inputs = (0.0, 0.0, 0.0)
+		else:
+			inputs = (self.memory[HEATER1PWM_ADDR]*100/255, self.memory[HEATER2PWM_ADDR]*100/255, self.memory[COOLERPWM_ADDR]*100/255)
+		if inputs != self._inputs[-1][1:]:
+			self._inputs.append((self._time,) + inputs)
+
+	def _update(self):
+		# Integrates the thermal model up to the current clock time
+		now = self.clock.millis()
+		while self._time < now:
+			step = min(INTEGRATION_STEP, now - self._time)
+			self._integrate(step)
+			self._time = self._time + step
+			if self._last_communication_time is not None and self._time - self._last_communication_time > CONNECTION_TIME:
+				self._applyInputs()
+		self._storeTemperatures()
+
+	def _integrate(self, step):
+		# Inputs applied before (now - time delay) drive the heaters, which gives the dead time
+		delayed_time = self._time - self.time_delay*1000
+		while len(self._inputs) > 1 and self._inputs[1][0] <= delayed_time:
+			self._inputs.popleft()
+		_, heater_1, heater_2, _ = self._inputs[0]
+		fan = self._inputs[-1][3] # The fan acts on the airflow without dead time
+		losses = 1 + self.fan_gain*fan/100
+		T1, T2 = self.heater_temperatures
+		dT1 = (self.static_gain*heater_1 - losses*(T1 - self.ambient_temperature) + self.coupling*(T2 - T1))/self.time_constant
+		dT2 = (self.static_gain*heater_2 - losses*(T2 - self.ambient_temperature) + self.coupling*(T1 - T2))/self.time_constant
+		self.heater_temperatures = [T1 + dT1*step/1000, T2 + dT2*step/1000]
+		if max(self.heater_temperatures) >= OVERHEATTEMPERATURE and not self.overheated:
+			self.overheated = True
+			self._applyInputs()
+
+	def _storeTemperatures(self):
+		self._storeTemperature(ROOMTEMP_ADDR, self.ambient_temperature)
+		self._storeTemperature(HEATER1TEMP_ADDR, self.heater_temperatures[0])
+		self._storeTemperature(HEATER2TEMP_ADDR, self.heater_temperatures[1])
+
+	def _storeTemperature(self, address, temperature):
+		# Sensor quantization followed by the (short)(100*T) conversion of the firmware
+		if self.resolution > 0:
+			temperature = round(temperature/self.resolution)*self.resolution
+		value = int(100*temperature) & 0xFFFF
+		self.memory[address] = value & 0xFF
+		self.memory[address + 1] = value >> 8
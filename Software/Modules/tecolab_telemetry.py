@@ -0,0 +1,147 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import collections
+import json
+import os
+import socket
+import stat
+import threading
+from Modules.tecolab_enums import CSVColumns
+from Modules.tecolab_messages import TecolabMessages
+
+TELEMETRY_QUEUE_SIZE = 1024 # Samples kept for the subscribers, the oldest ones are dropped first
+TELEMETRY_SEND_TIMEOUT = 0.5 # [s] Subscribers slower than this are disconnected
+TELEMETRY_PORT = 8765 # Used instead of a UNIX socket path where Python has no UNIX sockets (e.g. some Windows builds)
+TELEMETRY_COLUMNS = (
+	CSVColumns.Time,
+	CSVColumns.TemperatureH1, CSVColumns.TemperatureH2, CSVColumns.TemperatureAMB,
+	CSVColumns.SetPoint1Absolute, CSVColumns.SetPoint2Absolute, CSVColumns.SetPoint1Relative, CSVColumns.SetPoint2Relative,
+	CSVColumns.ComputedPWMH1, CSVColumns.ComputedPWMH2, CSVColumns.ComputedPWMFan,
+	CSVColumns.DisturbedPWMH1, CSVColumns.DisturbedPWMH2, CSVColumns.DisturbedPWMFan,
+	CSVColumns.ControlActionComputationTime,
+)
+_COLUMN_INDEXES = tuple(list(CSVColumns).index(column) for column in TELEMETRY_COLUMNS)
+
+def parseTelemetryAddress(address: str):
+	# 'PORT' or 'HOST:PORT' is a TCP address, anything else the path of a UNIX domain socket
+	host, separator, port = str(address).rpartition(':')
+	if port.isdigit():
+		return socket.AF_INET, (host if separator else '127.0.0.1', int(port))
+	if not hasattr(socket, 'AF_UNIX'):
+		print(TecolabMessages.WarningMessage5.value, TELEMETRY_PORT)
+		return socket.AF_INET, ('127.0.0.1', TELEMETRY_PORT)
+	return socket.AF_UNIX, str(address)
+
+def _isUnixSocket(family, path):
+	return hasattr(socket, 'AF_UNIX') and family == socket.AF_UNIX and os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode)
+
+class TelemetryPublisher:
+	# Streams the logged samples as JSON lines to every connected subscriber. publish() only
+	# appends to a bounded deque, the sockets are handled by a sender thread, so slow or missing
+	# subscribers never delay the control loop: when the deque is full the oldest samples are dropped.
+	def __init__(self, address: str, queue_size: int = TELEMETRY_QUEUE_SIZE):
+		self.address = address
+		self.family, self._address = parseTelemetryAddress(address)
+		self.published = 0
+		self.dropped = 0
+		self._samples = collections.deque(maxlen = max(int(queue_size), 1))
+		self._ready = threading.Event()
+		self._running = True
+		self._subscribers = list()
+		if _isUnixSocket(self.family, self._address):
+			os.unlink(self._address) # Socket left by a previous run
+		elif self.family != socket.AF_INET and os.path.exists(self._address):
+			print(TecolabMessages.ErrorMessage13.value, self._address)
+			exit()
+		self._server = socket.socket(self.family, socket.SOCK_STREAM)
+		if self.family == socket.AF_INET:
+			self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+		self._server.bind(self._address)
+		self._server.listen()
+		self._server.setblocking(False)
+		self._sender = threading.Thread(target = self._senderLoop, name = 'TeCoLabTelemetry', daemon = True)
+		self._sender.start()
+
+	def publish(self, row: tuple):
+		# Called from the control loop with a log row, in the order of CSVColumns
+		if len(self._samples) == self._samples.maxlen:
+			self.dropped = self.dropped + 1
+		self._samples.append(row)
+		self.published = self.published + 1
+		self._ready.set()
+
+	def close(self):
+		if self._running:
+			self._running = False
+			self._ready.set()
+			self._sender.join()
+			for subscriber in self._subscribers:
+				subscriber.close()
+			self._server.close()
+			if _isUnixSocket(self.family, self._address):
+				os.unlink(self._address)
+
+	def _senderLoop(self):
+		while self._running or self._samples:
+			self._ready.wait(0.1)
+			self._ready.clear()
+			self._accept()
+			lines = list()
+			while self._samples:
+				lines.append(_encodeSample(self._samples.popleft()))
+			if lines and self._subscribers:
+				self._send(b''.join(lines))
+
+	def _accept(self):
+		while True:
+			try:
+				subscriber, _ = self._server.accept()
+			except (BlockingIOError, OSError):
+				return
+			subscriber.settimeout(TELEMETRY_SEND_TIMEOUT)
+			self._subscribers.append(subscriber)
+
+	def _send(self, data):
+		for subscriber in list(self._subscribers):
+			try:
+				subscriber.sendall(data)
+			except OSError:
+				subscriber.close()
+				self._subscribers.remove(subscriber)
+
+def _encodeSample(row):
+	sample = dict()
+	for column, index in zip(TELEMETRY_COLUMNS, _COLUMN_INDEXES):
+		value = float(row[index])
+		sample[column.value] = value if value == value else None # NaN is not valid JSON
+	return (json.dumps(sample) + '\n').encode()
+
+def subscribeTelemetry(address: str):
+	# Yields the samples published on the address as dictionaries, until the publisher closes
+	family, address = parseTelemetryAddress(address)
+	with socket.socket(family, socket.SOCK_STREAM) as connection:
+		connection.connect(address)
+		with connection.makefile('rb') as stream:
+			for line in stream:
+				yield json.loads(line)
@@ -0,0 +1,83 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import math
+
+HISTOGRAM_SUB_BUCKETS = 16 # Buckets per power of two, about 4% resolution
+HISTOGRAM_BUCKETS = 40*HISTOGRAM_SUB_BUCKETS # Up to 2^40 ns (about 18 minutes)
+TIMING_STAGES = ('SLACK', 'IO', 'CTRL', 'DIST', 'LOG') # Scheduler slack, serial round trip, controller, disturbances and logging
+TIMING_BUSY_STAGES = ('IO', 'CTRL', 'DIST', 'LOG')
+
+class LatencyHistogram:
+	# Streaming histogram of durations [ns] with logarithmic buckets, so percentiles need
+	# constant memory no matter how long the experiment runs
+	def __init__(self):
+		self.counts = [0]*HISTOGRAM_BUCKETS
+		self.count = 0
+		self.total = 0
+		self.max = 0
+
+	def record(self, duration: int):
+		duration = max(int(duration), 1)
+		self.counts[min(int(math.log2(duration)*HISTOGRAM_SUB_BUCKETS), HISTOGRAM_BUCKETS - 1)] += 1
+		self.count = self.count + 1
+		self.total = self.total + duration
+		if duration > self.max:
+			self.max = duration
+
+	def percentile(self, percentage: float):
+		# Upper edge of the bucket holding the percentile [ns], never above the maximum
+		if self.count == 0:
+			return 0
+		target = max(math.ceil(self.count*percentage/100), 1)
+		accumulated = 0
+		for index, count in enumerate(self.counts):
+			accumulated = accumulated + count
+			if accumulated >= target:
+				return min(2**((index + 1)/HISTOGRAM_SUB_BUCKETS), self.max)
+		return self.max
+
+class LoopTiming:
+	# Duration of each stage of the control loop. The last values [ms] go to the log and
+	# every value feeds the histogram of its stage.
+	def __init__(self, period: int):
+		self.budget = max(int(period), 1)*1000000 # [ns]
+		self.histograms = {stage: LatencyHistogram() for stage in TIMING_STAGES}
+		self.last = dict.fromkeys(TIMING_STAGES, 0.0) # [ms]
+		self.overruns = 0 # Iterations whose busy time exceeded the period
+
+	def record(self, stage: str, duration: int):
+		self.histograms[stage].record(duration)
+		self.last[stage] = duration/1e6
+
+	def endIteration(self):
+		if sum(self.last[stage] for stage in TIMING_BUSY_STAGES)*1e6 > self.budget:
+			self.overruns = self.overruns + 1
+
+	def summary(self):
+		summary = {'LOOP_OVERRUNS': self.overruns}
+		for stage, histogram in self.histograms.items():
+			summary[f'{stage}_P50_MS'] = round(histogram.percentile(50)/1e6, 3)
+			summary[f'{stage}_P99_MS'] = round(histogram.percentile(99)/1e6, 3)
+			summary[f'{stage}_MAX_MS'] = round(histogram.max/1e6, 3)
+		return summary
@@ -0,0 +1,66 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import numpy as np
+from Modules.tecolab_enums import CSVColumns
+from Modules.tecolab_messages import TecolabMessages
+
+VALIDATION_ROWS_SHOWN = 10 # Offending rows listed per violated rule
+
+def validateSchedule(rows, period: int):
+	# Checks every rule on a compiled schedule (see tecolab_schedule) at once and returns the
+	# (message, offending row indexes) pairs of the errors and of the warnings. Missing columns
+	# were already replaced by their defaults, so they never fail a rule.
+	time = rows[CSVColumns.Time.value]
+	defined = ~np.isnan(time)
+	interval = np.zeros(len(time), dtype = bool)
+	interval[1:] = np.diff(time) < period # Also catches rows out of order
+	duplicated = np.zeros(len(time), dtype = bool)
+	if interval.any():
+		# Strictly increasing times cannot repeat, so only the other tables need to be sorted
+		order = np.argsort(time, kind = 'stable')
+		duplicated[order[1:]] = (np.diff(time[order]) == 0)
+	errors = _violations((
+		(TecolabMessages.ErrorMessage11, ~defined),
+		(TecolabMessages.ErrorMessage1, duplicated & defined),
+		(TecolabMessages.ErrorMessage2, interval),
+		(TecolabMessages.ErrorMessage3, time < 0),
+		(TecolabMessages.ErrorMessage4, rows[CSVColumns.SetPoint1Absolute.value] > 100),
+		(TecolabMessages.ErrorMessage5, rows[CSVColumns.SetPoint2Absolute.value] > 100),
+		(TecolabMessages.ErrorMessage6, rows[CSVColumns.RateSaturationH1.value] < 0),
+		(TecolabMessages.ErrorMessage7, rows[CSVColumns.RateSaturationH2.value] < 0),
+		(TecolabMessages.ErrorMessage8, rows[CSVColumns.RateSaturationFan.value] < 0),
+	))
+	warnings = _violations((
+		(TecolabMessages.WarningMessage1, rows[CSVColumns.SetPoint1Relative.value] < 0),
+		(TecolabMessages.WarningMessage2, rows[CSVColumns.SetPoint2Relative.value] < 0),
+	))
+	return errors, warnings
+
+def printViolations(violations):
+	for message, offending in violations:
+		shown = ', '.join(str(row) for row in offending[:VALIDATION_ROWS_SHOWN])
+		print(message.value, f'Rows: {shown}' + (', ...' if len(offending) > VALIDATION_ROWS_SHOWN else ''))
+
+def _violations(rules):
+	return [(message, np.flatnonzero(mask)) for message, mask in rules if mask.any()]
@@ -21,50 +21,86 @@ SOFTWARE.
 '''
 
 import importlib
-from Modules.tecolab_experiment import Experiment
-from Modules.tecolab_communication_protocol import searchTeCoLabPort, readTemperatures, writePWMs
+import importlib.util
 from Modules.tecolab_command_line_arguments import getParameters
 from Modules.tecolab_messages import TecolabMessages
+from Modules.tecolab_clock import SystemClock, VirtualClock
+
+TABLE_PREVIEW_ROWS = 10 # First rows of the experiment table shown before the experiment starts
 
 ## Get parameters
 args = getParameters()
-expFilePath = 'Experiments/' + args.ExperimentFileName + '.csv'
 controlFilePath = 'Controllers.' + args.ControllerModuleName
+if importlib.util.find_spec(controlFilePath) is None:
+	print(TecolabMessages.ErrorMessage10.value, controlFilePath)
+	exit()
+
+## Search for a TeCoLab device. Only the modules needed to reach the device are imported so
+## far: numpy, pandas and the controller dependencies are loaded after the board answered.
+if args.replay is not None:
+	from Modules.tecolab_capture import ReplayDevice
+	print(TecolabMessages.Message14.value + args.replay)
+	clock = SystemClock() if args.realtime else VirtualClock()
+	tecolab = ReplayDevice(args.replay, speed = 1 if args.realtime else 0)
+elif args.simulate:
+	from Modules.tecolab_simulator import SimulatedTeCoLab
+	print(TecolabMessages.Message9.value)
+	clock = SystemClock() if args.realtime else VirtualClock()
+	tecolab = SimulatedTeCoLab(clock)
+else:
+	from Modules.tecolab_port_search import searchTeCoLabPort
+	clock = SystemClock()
+	tecolab = searchTeCoLabPort()
+	if tecolab == False:
+		print(TecolabMessages.Message1.value)
+		exit()
+if args.capture is not None:
+	from Modules.tecolab_capture import CaptureDevice
+	tecolab = CaptureDevice(tecolab, args.capture, clock)
+
+## Load the remaining modules
+from Modules.tecolab_experiment import Experiment
+from Modules.tecolab_communication_protocol import getLinkStatistics, TeCoLabLinkError
+from Modules.tecolab_runner import runExperiment
+from Modules.tecolab_schedule import experimentPath
+import pandas as pd
 controlModule = importlib.import_module(controlFilePath)
+expFilePath = experimentPath(args.ExperimentFileName)
 
-## Search for a TeCoLab device
-tecolab = searchTeCoLabPort()
-if tecolab == False:
-	print(TecolabMessages.Message1.value)
-	exit()
+## Start the telemetry stream
+telemetry = None
+if args.telemetry is not None:
+	from Modules.tecolab_telemetry import TelemetryPublisher
+	print(TecolabMessages.Message15.value + args.telemetry)
+	telemetry = TelemetryPublisher(args.telemetry)
 
 ## Load the selected experiment
+if (args.period < 1):
+	args.period = 1
 print(TecolabMessages.Message2.value + args.ExperimentFileName)
-experiment = Experiment(experiment_path = expFilePath, experiment_period = args.period)
-print(TecolabMessages.Message3.value)
-print(experiment.table)
+experiment = Experiment(experiment_path = expFilePath, experiment_period = args.period, clock = clock, log_format = args.log_format, telemetry = telemetry)
+print(TecolabMessages.Message3.value, len(experiment.schedule), TecolabMessages.Message17.value)
+print(pd.DataFrame(experiment.schedule.rows[:TABLE_PREVIEW_ROWS])) # Not experiment.table, which builds the whole table from a compiled schedule
 
 ## Load the selected controller
-if (args.period < 1):
-	args.period = 1
 controller = controlModule.Controller()
 controller.control_setup()
 
-while(experiment.is_running == True):
-	if (experiment.iterationControl() == True):
-		# Reads temperatures
-		experiment.setTemperatures(readTemperatures(tecolab))
-
-		# Get control action
-		experiment.setControlAction(controller._control_compute(experiment.getSetPoints(), experiment.getTemperatures()))
-
-		# Adds experiment disturbances
-		experiment.applyDisturbances()
-
-		# Applies to the board
-		writePWMs(tecolab, experiment.getDisturbedControlAction())
-
-		# Logs the information
-		experiment.log()
-
-writePWMs(tecolab, (0, 0, 0)) # Turn the board off after the experiment
\ No newline at end of file
+try:
+	runExperiment(tecolab, experiment, controller)
+except TeCoLabLinkError:
+	print(TecolabMessages.ErrorMessage9.value)
+	exit()
+finally:
+	tecolab.close() # Also closes the capture file
+	if telemetry is not None:
+		telemetry.close()
+print(TecolabMessages.Message10.value, experiment.scheduler.missed_deadlines, TecolabMessages.Message11.value, experiment.scheduler.ticks)
+print(TecolabMessages.Message13.value, ', '.join(f'{name}: {value}' for name, value in getLinkStatistics(tecolab).summary().items()))
+if args.replay is not None:
+	print(TecolabMessages.Message19.value, tecolab.mismatches)
+	if tecolab.mismatches > 0:
+		print(TecolabMessages.WarningMessage4.value)
+if telemetry is not None:
+	print(TecolabMessages.Message18.value, telemetry.dropped, TecolabMessages.Message11.value, telemetry.published)
+print(TecolabMessages.Message16.value, ', '.join(f'{name}: {value}' for name, value in experiment.timing.summary().items()))
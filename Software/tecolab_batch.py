@@ -0,0 +1,147 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import argparse
+import importlib
+import itertools
+import json
+import multiprocessing
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import pandas as pd
+from Modules.tecolab_experiment import Experiment
+from Modules.tecolab_schedule import experimentPath
+from Modules.tecolab_clock import VirtualClock
+from Modules.tecolab_simulator import SimulatedTeCoLab
+from Modules.tecolab_runner import runExperiment
+from Modules.tecolab_metrics import trackingMetrics
+from Modules.tecolab_logger import readLog, LOG_FORMATS
+
+## Other messages
+EXPFILESHELP = 'experiment file names in Experiments folder without extension'
+CONTMODULESHELP = 'controller module names in Controllers folder without extension'
+PARAMETERSHELP = 'JSON file with a list of controller parameter sets or a dictionary of parameter lists (grid search)'
+PERIODHELP = 'chooses TeCoLab sampling period (default 200)'
+JOBSHELP = 'number of parallel jobs (default: number of CPUs)'
+OUTPUTHELP = 'output folder for the job logs and the summary (default Logs/Batch_<date>)'
+LOGFORMATHELP = 'job log file format (default csv)'
+
+def getParameters():
+	parser = argparse.ArgumentParser(description = 'Runs every controller against every experiment on simulated TeCoLab devices.')
+	parser.add_argument('-e', '--experiments', nargs = '+', required = True, help = EXPFILESHELP)
+	parser.add_argument('-c', '--controllers', nargs = '+', required = True, help = CONTMODULESHELP)
+	parser.add_argument('-p', '--parameters', default = None, help = PARAMETERSHELP)
+	parser.add_argument('-t', '--period', type = int, default = 200, help = PERIODHELP)
+	parser.add_argument('-j', '--jobs', type = int, default = os.cpu_count(), help = JOBSHELP)
+	parser.add_argument('-l', '--log-format', default = 'csv', choices = list(LOG_FORMATS), help = LOGFORMATHELP)
+	parser.add_argument('-o', '--output', default = f'Logs/Batch_{datetime.now().strftime("%Y_%m_%d-%I_%M_%S_%p")}', help = OUTPUTHELP)
+	return parser.parse_args()
+
+def loadParameterSets(path):
+	# A list is used as is, a dictionary of lists is expanded into its cartesian product
+	if path is None:
+		return [dict()]
+	with open(path) as file:
+		parameters = json.load(file)
+	if isinstance(parameters, dict):
+		names = list(parameters.keys())
+		return [dict(zip(names, values)) for values in itertools.product(*[parameters[name] for name in names])]
+	return list(parameters)
+
+_stop = None # Event shared by the workers, set when the batch is interrupted
+
+def initWorker(stop):
+	global _stop
+	_stop = stop
+
+def runJob(job):
+	# Runs one (controller, experiment, parameter set) combination on its own simulated device.
+	# Parameters are set as controller attributes before control_setup() is called.
+	summary = {'JOB': job['index'], 'CONTROLLER': job['controller'], 'EXPERIMENT': job['experiment'], 'PARAMETERS': json.dumps(job['parameters']), 'LOG': job['log']}
+	if _stop is not None and _stop.is_set():
+		summary['ERROR'] = 'Cancelled' # Already handed to the worker when the batch was interrupted
+		return summary
+	try:
+		controlModule = importlib.import_module('Controllers.' + job['controller'])
+		clock = VirtualClock()
+		tecolab = SimulatedTeCoLab(clock)
+		experiment = Experiment(experiment_path = experimentPath(job['experiment']), experiment_period = job['period'], clock = clock, log_filename = job['log'], log_format = job['log_format'])
+		controller = controlModule.Controller()
+		for name, value in job['parameters'].items():
+			setattr(controller, name, value)
+		controller.control_setup()
+		runExperiment(tecolab, experiment, controller)
+		summary.update(trackingMetrics(readLog(job['log'])))
+		summary['ERROR'] = ''
+	except (Exception, SystemExit) as error:
+		# Experiment and controller modules report errors with exit(), which must not stop the
+		# batch. Ctrl-C is left to the main process, which cancels the jobs still queued.
+		summary['ERROR'] = ''.join(traceback.format_exception_only(type(error), error)).strip() or type(error).__name__
+	except KeyboardInterrupt:
+		if _stop is not None:
+			_stop.set() # The jobs this worker and the others already took are skipped
+		raise
+	return summary
+
+def main():
+	args = getParameters()
+	os.makedirs(args.output, exist_ok = True)
+	parameterSets = loadParameterSets(args.parameters)
+	jobs = list()
+	for controller, experiment, (index, parameters) in itertools.product(args.controllers, args.experiments, enumerate(parameterSets)):
+		jobs.append({
+			'index': len(jobs),
+			'controller': controller,
+			'experiment': experiment,
+			'parameters': parameters,
+			'period': max(args.period, 1),
+			'log': os.path.join(args.output, f'{len(jobs):04d}_{controller}_{experiment}_{index}{LOG_FORMATS[args.log_format]}'),
+			'log_format': args.log_format,
+		})
+
+	results = list()
+	stop = multiprocessing.Event()
+	executor = ProcessPoolExecutor(max_workers = max(args.jobs, 1), initializer = initWorker, initargs = (stop,))
+	try:
+		futures = [executor.submit(runJob, job) for job in jobs]
+		for future in as_completed(futures):
+			result = future.result()
+			results.append(result)
+			print(f'[{len(results)}/{len(jobs)}] {result["CONTROLLER"]} x {result["EXPERIMENT"]} {result["PARAMETERS"]} {result["ERROR"] or "done"}')
+	except KeyboardInterrupt:
+		# The running jobs got the Ctrl-C too and close their logs, the queued ones never start
+		stop.set()
+		print(f'Interrupted: {len(results)} of {len(jobs)} jobs finished.')
+	finally:
+		executor.shutdown(cancel_futures = True)
+
+	if not results:
+		return
+	summary = pd.DataFrame(results).sort_values('JOB')
+	summary.to_csv(os.path.join(args.output, 'summary.csv'), index = False)
+	print(summary.to_string(index = False))
+
+if __name__ == '__main__':
+	main()
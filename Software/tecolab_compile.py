@@ -0,0 +1,64 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import argparse
+import pathlib
+import sys
+import pandas as pd
+from Modules.tecolab_schedule import compileSchedule, saveSchedule, SCHEDULE_EXTENSION
+from Modules.tecolab_validation import validateSchedule, printViolations
+
+## Other messages
+EXPFILESHELP = 'experiment file names in Experiments folder without extension, or paths to experiment CSV files'
+PERIODHELP = 'TeCoLab sampling period the experiments are checked against (default 200)'
+CHECKHELP = 'only validates the experiments, without writing the compiled schedules'
+
+def getParameters():
+	parser = argparse.ArgumentParser(description = f'Validates experiment tables, reporting every violation, and compiles them into {SCHEDULE_EXTENSION} schedules that tecolab.py memory-maps.')
+	parser.add_argument('ExperimentFileNames', nargs = '+', help = EXPFILESHELP)
+	parser.add_argument('-t', '--period', type = int, default = 200, help = PERIODHELP)
+	parser.add_argument('--check', help = CHECKHELP, action = 'store_true')
+	return parser.parse_args()
+
+def main():
+	args = getParameters()
+	failed = False
+	for name in args.ExperimentFileNames:
+		path = pathlib.Path(name)
+		if path.suffix.lower() != '.csv':
+			path = pathlib.Path('Experiments')/(name + '.csv')
+		rows = compileSchedule(pd.read_csv(path))
+		errors, warnings = validateSchedule(rows, max(args.period, 1))
+		print(f'{path}: {len(rows)} rows, {len(errors)} errors, {len(warnings)} warnings')
+		printViolations(errors + warnings)
+		if errors:
+			failed = True
+		elif not args.check:
+			compiled = path.with_suffix(SCHEDULE_EXTENSION)
+			saveSchedule(rows, compiled)
+			print(f'{path} -> {compiled}')
+	if failed:
+		sys.exit(1)
+
+if __name__ == '__main__':
+	main()
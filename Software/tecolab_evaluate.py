@@ -0,0 +1,59 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import argparse
+import importlib
+import time
+from Modules.tecolab_logger import readLog
+from Modules.tecolab_evaluation import evaluateLTIController, replayPerSample, scoreControlActions
+
+## Other messages
+LOGFILEHELP = 'log file (CSV, Feather or Parquet) of a real or simulated experiment'
+CONTMODULEHELP = 'controller module name in Controllers folder without extension'
+BLOCKSHELP = 'HEATER=BLOCK pairs, where BLOCK is the index of an LTI block fed by the tracking error, or the controller attribute holding it (e.g. 1=pid). Without blocks, the controller is called on every sample.'
+
+def getParameters():
+	parser = argparse.ArgumentParser(description = 'Scores the control actions a controller would compute on the setpoints and temperatures of a log.')
+	parser.add_argument('LogFile', help = LOGFILEHELP)
+	parser.add_argument('ControllerModuleName', help = CONTMODULEHELP)
+	parser.add_argument('-b', '--blocks', nargs = '+', default = [], help = BLOCKSHELP)
+	return parser.parse_args()
+
+def main():
+	args = getParameters()
+	log = readLog(args.LogFile)
+	controller = importlib.import_module('Controllers.' + args.ControllerModuleName).Controller()
+	controller.control_setup()
+	blocks = dict()
+	for pair in args.blocks:
+		heater, block = pair.split('=')
+		blocks[int(heater)] = int(block) if block.isdigit() else getattr(controller, block)
+
+	time_start = time.perf_counter()
+	pwm = evaluateLTIController(controller, log, blocks) if blocks else replayPerSample(controller, log)
+	time_evaluation = time.perf_counter() - time_start
+	print(', '.join(f'{name}: {value:.4g}' for name, value in scoreControlActions(log, pwm).items()))
+	print(f'{len(log)} samples evaluated in {1000*time_evaluation:.1f} ms')
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,75 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import argparse
+import json
+import pathlib
+import sys
+import numpy as np
+from Modules.tecolab_generator import generateExperiment, writeExperiment, DEFAULT_SPEC
+from Modules.tecolab_schedule import compileSchedule, saveSchedule, SCHEDULE_EXTENSION
+from Modules.tecolab_validation import validateSchedule, printViolations
+
+## Other messages
+EXPFILEHELP = 'name of the generated experiment in Experiments folder, without extension'
+SPECHELP = 'JSON file with the experiment spec (default: setpoint steps with random noise and saturation segments, see tecolab_generator)'
+SEEDHELP = 'random seed (default: a new one, which is printed)'
+DURATIONHELP = 'overrides the duration of the spec in ms'
+PERIODHELP = 'TeCoLab sampling period the experiment is checked against (default 200)'
+COMPILEHELP = 'also writes the compiled schedule used by tecolab.py'
+
+def getParameters():
+	parser = argparse.ArgumentParser(description = 'Generates a reproducible randomized experiment table from a seed and a spec.')
+	parser.add_argument('ExperimentFileName', help = EXPFILEHELP)
+	parser.add_argument('--spec', default = None, help = SPECHELP)
+	parser.add_argument('-s', '--seed', type = int, default = None, help = SEEDHELP)
+	parser.add_argument('-d', '--duration', type = int, default = None, help = DURATIONHELP)
+	parser.add_argument('-t', '--period', type = int, default = 200, help = PERIODHELP)
+	parser.add_argument('--compile', help = COMPILEHELP, action = 'store_true')
+	return parser.parse_args()
+
+def main():
+	args = getParameters()
+	spec = DEFAULT_SPEC
+	if args.spec is not None:
+		with open(args.spec) as file:
+			spec = json.load(file)
+	if args.duration is not None:
+		spec = dict(spec, duration = args.duration)
+	seed = args.seed if args.seed is not None else int(np.random.SeedSequence().entropy % 2**32)
+
+	table = generateExperiment(spec, seed)
+	rows = compileSchedule(table)
+	errors, warnings = validateSchedule(rows, max(args.period, 1))
+	printViolations(errors + warnings)
+	if errors:
+		sys.exit(1)
+	path = pathlib.Path('Experiments')/(args.ExperimentFileName + '.csv')
+	writeExperiment(table, path)
+	print(f'{path}: {len(table)} rows, seed {seed}')
+	if args.compile:
+		saveSchedule(rows, path.with_suffix(SCHEDULE_EXTENSION))
+		print(f'{path} -> {path.with_suffix(SCHEDULE_EXTENSION)}')
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,53 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import argparse
+import pathlib
+from Modules.tecolab_logger import exportLog, LOG_FORMATS
+
+## Other messages
+LOGFILESHELP = 'log files to convert (CSV, Feather or Parquet)'
+FORMATHELP = 'format of the converted logs (default csv)'
+OUTPUTHELP = 'output folder (default: next to each log)'
+
+def getParameters():
+	parser = argparse.ArgumentParser(description = 'Converts TeCoLab log files between the CSV, Feather and Parquet formats.')
+	parser.add_argument('LogFiles', nargs = '+', help = LOGFILESHELP)
+	parser.add_argument('-f', '--format', default = 'csv', choices = list(LOG_FORMATS), help = FORMATHELP)
+	parser.add_argument('-o', '--output', default = None, help = OUTPUTHELP)
+	return parser.parse_args()
+
+def main():
+	args = getParameters()
+	for filename in args.LogFiles:
+		path = pathlib.Path(filename)
+		folder = pathlib.Path(args.output) if args.output is not None else path.parent
+		folder.mkdir(parents = True, exist_ok = True)
+		export_filename = folder/(path.stem + LOG_FORMATS[args.format])
+		if export_filename.resolve() == path.resolve():
+			continue
+		exportLog(filename, str(export_filename))
+		print(f'{filename} -> {export_filename}')
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,47 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import argparse
+from Modules.tecolab_telemetry import subscribeTelemetry
+
+## Other messages
+ADDRESSHELP = 'telemetry address given to tecolab.py --telemetry (UNIX socket path or [HOST:]PORT)'
+EVERYHELP = 'prints one of every N samples (default 1)'
+
+def getParameters():
+	parser = argparse.ArgumentParser(description = 'Prints the live telemetry of a running TeCoLab experiment.')
+	parser.add_argument('Address', help = ADDRESSHELP)
+	parser.add_argument('-n', '--every', type = int, default = 1, help = EVERYHELP)
+	return parser.parse_args()
+
+def main():
+	args = getParameters()
+	try:
+		for index, sample in enumerate(subscribeTelemetry(args.Address)):
+			if index % max(args.every, 1) == 0:
+				print(', '.join(f'{name}: {value}' for name, value in sample.items()), flush = True)
+	except KeyboardInterrupt:
+		pass
+
+if __name__ == '__main__':
+	main()
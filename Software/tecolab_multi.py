@@ -0,0 +1,168 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import argparse
+import asyncio
+import importlib
+import threading
+import time
+import traceback
+from datetime import datetime
+from Modules.tecolab_experiment import Experiment
+from Modules.tecolab_schedule import experimentPath
+from Modules.tecolab_communication_protocol import searchTeCoLabPorts, getLinkStatistics
+from Modules.tecolab_runner import runExperiment, runExperimentAsync
+from Modules.tecolab_async_protocol import AsyncTeCoLab
+from Modules.tecolab_messages import TecolabMessages
+from Modules.tecolab_clock import SystemClock, VirtualClock
+from Modules.tecolab_simulator import SimulatedTeCoLab
+from Modules.tecolab_logger import LOG_FORMATS
+
+## Other messages
+EXPFILEHELP = 'experiment file name in Experiments folder without extension'
+CONTMODULEHELP = 'controller module name in Controllers folder without extension'
+PERIODHELP = 'chooses TeCoLab sampling period (default 200)'
+SIMULATEHELP = 'drives the given number of simulated TeCoLab devices instead of the connected boards'
+REALTIMEHELP = 'runs the simulated TeCoLab devices in real time'
+ASYNCIOHELP = 'schedules all control loops from one asyncio event loop instead of one thread per device'
+LOGFORMATHELP = 'log file format (default csv)'
+
+def getParameters():
+	parser = argparse.ArgumentParser(description = 'Runs the same experiment and controller on every TeCoLab device connected, one control loop per device.')
+	parser.add_argument('ExperimentFileName', help = EXPFILEHELP)
+	parser.add_argument('ControllerModuleName', help = CONTMODULEHELP)
+	parser.add_argument('-t', '--period', type = int, default = 200, help = PERIODHELP)
+	parser.add_argument('-s', '--simulate', type = int, default = 0, help = SIMULATEHELP)
+	parser.add_argument('--realtime', help = REALTIMEHELP, action = 'store_true')
+	parser.add_argument('--asyncio', help = ASYNCIOHELP, action = 'store_true')
+	parser.add_argument('-l', '--log-format', default = 'csv', choices = list(LOG_FORMATS), help = LOGFORMATHELP)
+	return parser.parse_args()
+
+class Rig:
+	# One TeCoLab device with its own experiment, controller and worker (thread or asyncio task)
+	def __init__(self, index, tecolab, experiment, controller):
+		self.index = index
+		self.tecolab = tecolab
+		self.experiment = experiment
+		self.controller = controller
+		self.error = None
+		self.time_running = 0 # [s]
+		self.thread = threading.Thread(target = self._run, name = f'TeCoLabRig{index}')
+
+	def _run(self):
+		time_start = time.monotonic()
+		try:
+			runExperiment(self.tecolab, self.experiment, self.controller)
+		except (Exception, SystemExit) as error:
+			# Same errors as runAsync() and tecolab_batch, Ctrl-C is handled by main()
+			self.error = ''.join(traceback.format_exception_only(type(error), error)).strip() or type(error).__name__
+		finally:
+			self.time_running = time.monotonic() - time_start
+			self.tecolab.close()
+
+	async def runAsync(self):
+		time_start = time.monotonic()
+		try:
+			async with AsyncTeCoLab(self.tecolab) as tecolab:
+				await runExperimentAsync(tecolab, self.experiment, self.controller)
+		except (Exception, SystemExit) as error:
+			# Only this rig stops, like a failing thread in the threaded mode
+			self.error = ''.join(traceback.format_exception_only(type(error), error)).strip() or type(error).__name__
+		finally:
+			self.time_running = time.monotonic() - time_start
+
+	def stop(self):
+		self.experiment.is_running = False
+
+	def statistics(self):
+		scheduler = self.experiment.scheduler
+		statistics = {
+			'RIG': self.index,
+			'PORT': self.tecolab.name,
+			'LOG': self.experiment.log_filename,
+			'TICKS': scheduler.ticks,
+			'MISSED_DEADLINES': scheduler.missed_deadlines,
+			'MAX_LATENESS_MS': scheduler.max_lateness/1e6,
+			'RUNNING_TIME_S': round(self.time_running, 3),
+		}
+		statistics.update(getLinkStatistics(self.tecolab).summary())
+		statistics.update(self.experiment.timing.summary())
+		statistics['ERROR'] = self.error or ''
+		return statistics
+
+async def runRigsAsync(rigs):
+	await asyncio.gather(*[rig.runAsync() for rig in rigs])
+
+def main():
+	args = getParameters()
+	period = max(args.period, 1)
+	controlModule = importlib.import_module('Controllers.' + args.ControllerModuleName)
+
+	## Search for every TeCoLab device
+	if args.simulate > 0:
+		print(TecolabMessages.Message9.value)
+		devices = list()
+		for _ in range(args.simulate):
+			clock = SystemClock() if args.realtime else VirtualClock()
+			devices.append((SimulatedTeCoLab(clock), clock))
+	else:
+		devices = [(tecolab, SystemClock()) for tecolab in searchTeCoLabPorts()]
+	if not devices:
+		print(TecolabMessages.Message1.value)
+		exit()
+
+	## One experiment and one controller per device
+	print(TecolabMessages.Message2.value + args.ExperimentFileName)
+	timestamp = datetime.now().strftime("%Y_%m_%d-%I_%M_%S_%p")
+	rigs = list()
+	for index, (tecolab, clock) in enumerate(devices):
+		experiment = Experiment(experiment_path = experimentPath(args.ExperimentFileName), experiment_period = period, clock = clock, log_filename = f'Logs/{timestamp}_rig{index}{LOG_FORMATS[args.log_format]}', log_format = args.log_format)
+		controller = controlModule.Controller()
+		controller.control_setup()
+		rigs.append(Rig(index, tecolab, experiment, controller))
+
+	if args.asyncio:
+		try:
+			asyncio.run(runRigsAsync(rigs))
+		except KeyboardInterrupt:
+			pass # The tasks are cancelled and each one turns its board off
+	else:
+		for rig in rigs:
+			rig.thread.start()
+		try:
+			while any(rig.thread.is_alive() for rig in rigs):
+				for rig in rigs:
+					rig.thread.join(timeout = 0.5)
+		except KeyboardInterrupt:
+			# Each loop stops at its next tick and turns its board off
+			for rig in rigs:
+				rig.stop()
+			for rig in rigs:
+				rig.thread.join()
+
+	print(TecolabMessages.Message12.value)
+	for rig in rigs:
+		print(', '.join(f'{name}: {value}' for name, value in rig.statistics().items()))
+
+if __name__ == '__main__':
+	main()
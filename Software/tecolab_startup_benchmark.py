@@ -0,0 +1,96 @@
+'''
+Copyright 2024 Leonardo Cabral
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# Modules imported by tecolab.py before it looks for a TeCoLab device
+STARTUP_MODULES = ('Modules.tecolab_command_line_arguments', 'Modules.tecolab_messages', 'Modules.tecolab_clock', 'Modules.tecolab_port_search')
+# Modules imported once the device answered
+EXPERIMENT_MODULES = ('Modules.tecolab_experiment', 'Modules.tecolab_communication_protocol', 'Modules.tecolab_runner')
+STARTUP_BUDGET = 100 # [ms]
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)')
+
+## Other messages
+CONTMODULEHELP = 'also reports the whole import path of tecolab.py with this controller module'
+BUDGETHELP = f'import time budget of the modules loaded before the device search in ms (default {STARTUP_BUDGET})'
+REPEATHELP = 'number of measurements, the median is compared to the budget (default 5)'
+SLOWESTHELP = 'number of slowest imports shown (default 10)'
+
+def getParameters():
+	parser = argparse.ArgumentParser(description = 'Measures the import time of the tecolab.py startup path with python -X importtime and checks it against a budget.')
+	parser.add_argument('-c', '--controller', default = None, help = CONTMODULEHELP)
+	parser.add_argument('-b', '--budget', type = float, default = STARTUP_BUDGET, help = BUDGETHELP)
+	parser.add_argument('-r', '--repeat', type = int, default = 5, help = REPEATHELP)
+	parser.add_argument('-n', '--slowest', type = int, default = 10, help = SLOWESTHELP)
+	return parser.parse_args()
+
+def measureImports(modules):
+	# Imports the modules in a fresh interpreter and returns the total import time [ms] and
+	# the (cumulative time [ms], module) pairs of every import
+	code = 'import sys; sys.path.insert(0, "."); ' + '; '.join(f'import {module}' for module in modules)
+	result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output = True, text = True, check = True, cwd = os.path.dirname(os.path.abspath(__file__)))
+	imports = list()
+	total = 0
+	for line in result.stderr.splitlines():
+		match = IMPORTTIME_LINE.match(line)
+		if match is None:
+			continue
+		cumulative = int(match.group(2))/1000
+		imports.append((cumulative, match.group(4)))
+		if len(match.group(3)) == 1: # Imported by the measured code itself
+			total = total + cumulative
+	return total, imports
+
+def main():
+	args = getParameters()
+	median, imports = medianImports(STARTUP_MODULES, args.repeat)
+	printSlowest(imports, args.slowest)
+	if args.controller is not None:
+		full_median, full_imports = medianImports(STARTUP_MODULES + EXPERIMENT_MODULES + ('Controllers.' + args.controller,), args.repeat)
+		print(f'Whole import path with Controllers.{args.controller}:')
+		printSlowest(full_imports, args.slowest)
+		print(f'Whole import time: {full_median:.1f} ms')
+	print(f'Import time before the device search: {median:.1f} ms (median of {max(args.repeat, 1)}), budget: {args.budget:.1f} ms')
+	if median > args.budget:
+		print('Import time budget exceeded.')
+		sys.exit(1)
+
+def medianImports(modules, repeat):
+	totals = list()
+	for _ in range(max(repeat, 1)):
+		total, imports = measureImports(modules)
+		totals.append(total)
+	return statistics.median(totals), imports
+
+def printSlowest(imports, count):
+	print('Slowest imports (cumulative ms):')
+	for cumulative, module in sorted(imports, reverse = True)[:count]:
+		print(f'{cumulative:10.1f}  {module}')
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,44 @@
+import numpy as np
+from Modules.tecolab_capture import CaptureDevice, ReplayDevice, readCapture, captureFrames, DIRECTION_RX
+from Modules.tecolab_clock import VirtualClock
+from Modules.tecolab_codec import decodeTemperatureFrames
+from Modules.tecolab_communication_protocol import controlCycle
+from Modules.tecolab_simulator import SimulatedTeCoLab
+
+ACTIONS = [(10*k, 5*k, 0) for k in range(20)]
+
+def capture(path):
+	clock = VirtualClock()
+	device = CaptureDevice(SimulatedTeCoLab(clock), str(path), clock)
+	temperatures = list()
+	for action in ACTIONS:
+		clock.advance(200)
+		temperatures.append(controlCycle(device, action))
+	return device, temperatures
+
+def test_frames_are_on_disk_before_close(tmp_path):
+	device, _ = capture(tmp_path/'run.cap')
+	assert len(readCapture(str(tmp_path/'run.cap'))) == 2*len(ACTIONS)
+	device.close()
+
+def test_replay_of_the_same_requests_has_no_mismatch(tmp_path):
+	capture(tmp_path/'run.cap')[0].close()
+	replay = ReplayDevice(str(tmp_path/'run.cap'))
+	temperatures = [controlCycle(replay, action) for action in ACTIONS]
+	assert replay.mismatches == 0
+	assert temperatures == capture(tmp_path/'again.cap')[1]
+
+def test_replay_counts_requests_that_differ_from_the_capture(tmp_path):
+	capture(tmp_path/'run.cap')[0].close()
+	replay = ReplayDevice(str(tmp_path/'run.cap'))
+	for k, action in enumerate(ACTIONS):
+		controlCycle(replay, action if k < 5 else (0, 0, 100))
+	assert replay.mismatches == len(ACTIONS) - 5
+
+def test_short_record_does_not_shift_the_next_frames(tmp_path):
+	capture(tmp_path/'run.cap')[0].close()
+	records = np.array(readCapture(str(tmp_path/'run.cap')))
+	short = records[records['direction'] == DIRECTION_RX][0].copy()
+	short['length'] = 3
+	_, _, valid = decodeTemperatureFrames(captureFrames(np.insert(records, 2, short), 8))
+	assert len(valid) == len(ACTIONS) and valid.all()
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from Modules.Utils.continuous_time_PID import Controller
+from Modules.tecolab_enums import CSVColumns
+from Modules.tecolab_evaluation import evaluateLTIController, replayPerSample, scoreControlActions
+
+class PIDController(Controller):
+	# PID on heater 1, fed by the tracking error of its absolute setpoint
+	def __init__(self, signal_period):
+		super().__init__()
+		self.set_signal_period(signal_period)
+		self.set_discretization_period(0.2)
+		self.pid = self.set_PID(3, 0.01, 0.5)
+
+	def control_action(self):
+		self.actuator_heater_1 = self.LTI_compute(self.pid, self.setpoint_abs_1 - self.temperature_heater_1)
+
+def loggedTrajectory(length):
+	# Setpoint steps on heater 1 and a noisy first-order temperature response, as a log would hold them
+	rng = np.random.default_rng(0)
+	setpoint = np.repeat(rng.uniform(30, 60, length//1000 + 1), 1000)[:length]
+	temperature = 25 + np.zeros(length)
+	for k in range(1, length):
+		temperature[k] = temperature[k - 1] + 0.002*(setpoint[k - 1] - temperature[k - 1])
+	log = pd.DataFrame({column.value: np.zeros(length) for column in CSVColumns})
+	log[CSVColumns.SetPoint1Absolute.value] = setpoint
+	log[CSVColumns.SetPoint2Absolute.value] = np.nan
+	log[CSVColumns.SetPoint1Relative.value] = np.nan
+	log[CSVColumns.SetPoint2Relative.value] = np.nan
+	log[CSVColumns.TemperatureH1.value] = temperature + rng.normal(0, 0.1, length)
+	log[CSVColumns.TemperatureAMB.value] = 25
+	return log
+
+@pytest.mark.parametrize('signal_period', [0, 3])
+def test_evaluation_of_a_log_matches_the_per_sample_replay(signal_period):
+	log = loggedTrajectory(9000)
+	controller = PIDController(signal_period)
+	expected = replayPerSample(controller, log)
+
+	controller = PIDController(signal_period)
+	pwm = evaluateLTIController(controller, log, {1: controller.pid})
+	h1 = CSVColumns.ComputedPWMH1.value
+	# ss2tf + lfilter and the state-space steps round differently, so the match is not bit-exact.
+	# Near the zero crossings the difference is relative to the size of the output, not of the sample.
+	np.testing.assert_allclose(pwm[h1], expected[h1], rtol = 1e-9, atol = 1e-9*np.abs(expected[h1]).max())
+	assert (pwm[CSVColumns.ComputedPWMH2.value] == 0).all() and (pwm[CSVColumns.ComputedPWMFan.value] == 0).all()
+
+	log[h1] = expected[h1]
+	score = scoreControlActions(log, pwm)
+	assert score['H1_PWM_RMSD'] < 1e-9*np.abs(expected[h1]).max()
+	assert score['H1_TOTAL_VARIATION'] == pytest.approx(np.abs(np.diff(expected[h1])).sum())
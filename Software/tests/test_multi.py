@@ -0,0 +1,38 @@
+import asyncio
+from Modules.tecolab_clock import VirtualClock
+from Modules.tecolab_controller import Controller
+from Modules.tecolab_experiment import Experiment
+from Modules.tecolab_simulator import SimulatedTeCoLab
+from tecolab_multi import Rig, runRigsAsync
+
+EXPERIMENT = 'TIME,SP1_ABS,SP2_ABS,H1_ADD_NOISE,H2_ADD_NOISE\n0,,,10,10\n60000,0,0,0,0\n'
+
+class DeadTeCoLab(SimulatedTeCoLab):
+	# Never answers, so no valid temperatures are ever read
+	def read(self, size: int = 1):
+		return b''
+
+	@property
+	def in_waiting(self):
+		return 0
+
+def test_failing_async_rig_does_not_stop_the_others(tmp_path):
+	(tmp_path/'experiment.csv').write_text(EXPERIMENT)
+	rigs = list()
+	for index in range(3):
+		clock = VirtualClock()
+		device = DeadTeCoLab(clock) if index == 1 else SimulatedTeCoLab(clock)
+		experiment = Experiment(experiment_path = str(tmp_path/'experiment.csv'), experiment_period = 200, clock = clock, log_filename = str(tmp_path/f'rig{index}.csv'))
+		controller = Controller()
+		controller.control_setup()
+		rigs.append(Rig(index, device, experiment, controller))
+	asyncio.run(runRigsAsync(rigs))
+
+	statistics = [rig.statistics() for rig in rigs]
+	assert 'TeCoLabLinkError' in statistics[1]['ERROR']
+	for index in (0, 2):
+		assert statistics[index]['ERROR'] == ''
+		assert statistics[index]['TICKS'] >= 300
+	# The rigs that kept running logged the whole experiment
+	for index in (0, 2):
+		assert len((tmp_path/f'rig{index}.csv').read_text().splitlines()) >= 300
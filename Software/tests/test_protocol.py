@@ -0,0 +1,49 @@
+import numpy as np
+from Modules.tecolab_clock import VirtualClock
+from Modules.tecolab_communication_protocol import controlCycle, getLinkStatistics
+from Modules.tecolab_simulator import SimulatedTeCoLab
+
+CYCLES = 5000
+
+class NoisyTeCoLab(SimulatedTeCoLab):
+	# Corrupts the answers like a noisy serial link: a bit flip in about 5% of the frames and a
+	# dropped byte, which truncates the frame, in about 5% of them
+	def __init__(self, clock, seed):
+		super().__init__(clock)
+		self.rng = np.random.default_rng(seed)
+
+	def read(self, size: int = 1):
+		answer = bytearray(super().read(size))
+		if answer and self.rng.random() < 0.05:
+			answer[self.rng.integers(len(answer))] ^= 1 << int(self.rng.integers(8))
+		if answer and self.rng.random() < 0.05:
+			del answer[self.rng.integers(len(answer))]
+		return bytes(answer)
+
+def test_control_cycle_recovers_from_corrupted_and_truncated_frames():
+	clock = VirtualClock()
+	clean = SimulatedTeCoLab(clock)
+	noisy = NoisyTeCoLab(clock, seed = 0)
+	held = 0
+	previous = None
+	for k in range(CYCLES):
+		controlAction = (k % 100, (k//7) % 100, 0)
+		expected = controlCycle(clean, controlAction)
+		temperatures = controlCycle(noisy, controlAction)
+		# Either the answer of this cycle or, when every retry failed, the last valid temperatures
+		if temperatures != expected:
+			assert temperatures == previous
+			held = held + 1
+		previous = temperatures
+		clock.advance(200)
+
+	statistics = getLinkStatistics(noisy)
+	assert getLinkStatistics(clean).summary()['FRAMES'] == CYCLES
+	assert statistics.frames + statistics.failures == CYCLES
+	assert statistics.checksum_errors > 0.03*CYCLES
+	assert statistics.timeouts > 0.03*CYCLES
+	assert statistics.resyncs == statistics.checksum_errors + statistics.timeouts
+	assert statistics.retries == statistics.checksum_errors + statistics.timeouts - statistics.failures
+	# Three attempts in a row fail in about 0.1% of the cycles
+	assert statistics.failures < 0.01*CYCLES
+	assert held <= statistics.failures
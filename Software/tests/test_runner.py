@@ -0,0 +1,33 @@
+import numpy as np
+from Modules.tecolab_clock import VirtualClock
+from Modules.tecolab_controller import Controller
+from Modules.tecolab_experiment import Experiment
+from Modules.tecolab_logger import readLog
+from Modules.tecolab_runner import runExperiment
+from Modules.tecolab_simulator import SimulatedTeCoLab
+
+class Ramp(Controller):
+	# A different heater 1 action on every sample
+	samples = 0
+
+	def control_action(self):
+		self.samples = self.samples + 1
+		self.actuator_heater_1 = self.samples % 50
+		self.actuator_heater_2 = 0
+		self.actuator_fan = 0
+
+def test_applied_pwm_is_the_previous_disturbed_pwm(tmp_path):
+	(tmp_path/'experiment.csv').write_text('TIME,H1_ADD_NOISE\n0,5\n20000,0\n')
+	clock = VirtualClock()
+	experiment = Experiment(experiment_path = str(tmp_path/'experiment.csv'), experiment_period = 200, clock = clock, log_filename = str(tmp_path/'log.csv'))
+	controller = Ramp()
+	controller.control_setup()
+	runExperiment(SimulatedTeCoLab(clock), experiment, controller)
+
+	log = readLog(str(tmp_path/'log.csv'))
+	for heater in ('H1', 'H2', 'F'):
+		applied = log[f'{heater}_A_PWM'].to_numpy()
+		disturbed = log[f'{heater}_D_PWM'].to_numpy()
+		assert applied[0] == 0
+		np.testing.assert_array_equal(applied[1:], disturbed[:-1])
+	assert len(np.unique(log['H1_D_PWM'])) > 10
@@ -0,0 +1,36 @@
+import pytest
+from Modules.tecolab_clock import VirtualClock
+from Modules.tecolab_communication_protocol import controlCycle, readTemperatures
+from Modules.tecolab_simulator import SimulatedTeCoLab
+
+def runSteps(tecolab, clock, controlAction, seconds, period = 200):
+	# Control cycles every period milliseconds of simulated time, returns the (time, temperatures) read
+	samples = list()
+	for _ in range(round(1000*seconds/period)):
+		samples.append((clock.millis(), controlCycle(tecolab, controlAction)))
+		clock.advance(period)
+	return samples
+
+def test_heater_step_has_the_dead_time_and_the_static_gain():
+	clock = VirtualClock()
+	tecolab = SimulatedTeCoLab(clock, resolution = 0)
+	samples = runSteps(tecolab, clock, (100, 0, 0), 3000)
+
+	# Nothing moves before the dead time, then heater 1 rises and heats heater 2 through the board
+	assert all(temperatures == (25, 25, 25) for time, temperatures in samples if time <= 1000*tecolab.time_delay)
+	assert all(temperatures[0] > 25 for time, temperatures in samples if time >= 1000*tecolab.time_delay + 1000)
+	# Steady state of the coupled heaters: 1.1*dT1 - 0.1*dT2 = 0.6*100 and 1.1*dT2 = 0.1*dT1
+	T1, T2, ambient = samples[-1][1]
+	assert T1 - ambient == pytest.approx(55, abs = 0.05)
+	assert T2 - ambient == pytest.approx(5, abs = 0.05)
+	# The 50 minutes of simulated time only moved the virtual clock
+	assert clock.millis() == 3000000
+
+def test_heaters_turn_off_when_the_communication_stops():
+	clock = VirtualClock()
+	tecolab = SimulatedTeCoLab(clock)
+	heated, _, _ = runSteps(tecolab, clock, (100, 0, 0), 600)[-1][1]
+	clock.advance(1200000)
+	cooled, _, ambient = readTemperatures(tecolab)
+	assert heated > 70
+	assert cooled - ambient < 1
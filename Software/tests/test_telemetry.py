@@ -0,0 +1,44 @@
+import pathlib
+import socket
+import subprocess
+import sys
+import pytest
+from Modules.tecolab_enums import CSVColumns
+from Modules.tecolab_telemetry import TelemetryPublisher
+
+SOFTWARE = pathlib.Path(__file__).resolve().parents[1]
+
+def test_regular_file_at_the_address_is_kept(tmp_path):
+	path = tmp_path/'results.csv'
+	path.write_text('precious')
+	with pytest.raises(SystemExit):
+		TelemetryPublisher(str(path))
+	assert path.read_text() == 'precious'
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason = 'no UNIX sockets')
+def test_stale_socket_is_replaced(tmp_path):
+	path = tmp_path/'telemetry.sock'
+	stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	stale.bind(str(path))
+	stale.close()
+	publisher = TelemetryPublisher(str(path))
+	publisher.close()
+	assert not path.exists()
+
+def test_full_queue_drops_the_oldest_samples(tmp_path):
+	publisher = TelemetryPublisher('127.0.0.1:0', queue_size = 1)
+	row = tuple(0.0 for _ in CSVColumns)
+	for _ in range(10000):
+		publisher.publish(row)
+	publisher.close()
+	assert publisher.published == 10000
+	assert publisher.dropped > 0
+
+def test_dropped_samples_are_reported():
+	logs = set((SOFTWARE/'Logs').iterdir())
+	try:
+		result = subprocess.run([sys.executable, 'tecolab.py', 'StepResponse', 'Template', '-s', '--telemetry', '127.0.0.1:0'], cwd = SOFTWARE, capture_output = True, text = True, timeout = 300)
+	finally:
+		for log in set((SOFTWARE/'Logs').iterdir()) - logs:
+			log.unlink()
+	assert 'Telemetry samples dropped:' in result.stdout